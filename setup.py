@@ -16,7 +16,8 @@ setup(
     python_requires=">=3.11",
     install_requires=[
         "anthropic>=0.40.0",
-        "httpx>=0.27.0",
+        "httpx[http2]>=0.27.0",
+        "orjson>=3.9.0",
         "beautifulsoup4>=4.12.0",
         "lxml>=5.0.0",
         "google-auth>=2.25.0",
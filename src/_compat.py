@@ -0,0 +1,49 @@
+"""Optional fast-path dependencies shared across the pipeline."""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# HTTP/2 needs the optional 'h2' package; fall back to HTTP/1.1 keep-alive without it
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - h2 is optional
+    HTTP2_AVAILABLE = False
+
+# orjson.JSONDecodeError subclasses this, so one except clause covers both parsers
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data):
+    """Parse JSON from bytes or str (with orjson when available)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, *, sort_keys: bool = False, indent: bool = False) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes (with orjson when available).
+
+    Args:
+        obj: Value to serialize
+        sort_keys: Sort object keys, so equal values serialize identically
+        indent: Pretty-print with a two-space indent instead of compact output
+    """
+    if orjson is not None:
+        option = 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+    if indent:
+        text = json.dumps(obj, sort_keys=sort_keys, indent=2, ensure_ascii=False)
+    else:
+        text = json.dumps(obj, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False)
+    return text.encode('utf-8')
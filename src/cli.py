@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """CLI for newsletter analysis pipeline."""
 
-import json
+import functools
 import logging
 import os
 import sys
@@ -12,10 +12,7 @@ import click
 import yaml
 from dotenv import load_dotenv
 
-from .extractors import AgenticExtractor
-from .connectors.gmail import GmailConnector
-from .connectors.notion import NotionConnector
-from .storage import Database
+from ._compat import dumps as json_dumps, loads as json_loads
 
 
 # Load environment variables
@@ -28,6 +25,34 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Extraction results cached by EML content hash
+EXTRACTION_CACHE_DIR = "data/cache/extractions"
+
+# Use libyaml's C loader when PyYAML was built with it
+YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=32)
+def _load_yaml_cached(path: str, mtime_ns: int):
+    """Parse a YAML file (mtime_ns keys the cache so edits are picked up)."""
+    with open(path) as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
+def load_yaml(path: Path):
+    """Load a YAML config file, parsing each unchanged file only once."""
+    return _load_yaml_cached(str(path), path.stat().st_mtime_ns)
+
+
+def read_json(path: Path) -> dict:
+    """Read an extraction result (parsed by orjson when available)."""
+    return json_loads(path.read_bytes())
+
+
+def write_json(path: Path, data: dict) -> None:
+    """Write an extraction result as indented JSON (serialized by orjson when available)."""
+    path.write_bytes(json_dumps(data, indent=True))
+
 
 @click.group()
 @click.version_option(version="0.1.0")
@@ -45,13 +70,26 @@ def cli():
               help='Output directory for JSON results')
 @click.option('--verbose', '-v', is_flag=True,
               help='Show detailed analysis output')
-def extract(eml_files, output_dir, verbose):
+@click.option('--batch', is_flag=True,
+              help='Use the Message Batches API (cheaper, but may take hours)')
+@click.option('--no-cache', is_flag=True,
+              help='Ignore cached results for previously extracted emails')
+@click.option('--max-workers', '-j', default=1, type=click.IntRange(min=1),
+              help='Number of files to extract in parallel')
+@click.option('--rpm', default=None, type=click.IntRange(min=1),
+              help='Max API requests per minute across parallel workers')
+def extract(eml_files, output_dir, verbose, batch, no_cache, max_workers, rpm):
     """Extract insights from .eml newsletter files.
 
     Examples:
         newsletter extract data/newsletters/message1.eml
         newsletter extract data/newsletters/*.eml -o results/
+        newsletter extract data/newsletters/*.eml --batch
+        newsletter extract data/newsletters/*.eml -j 8
     """
+    # Imported here so commands that don't extract skip loading the Anthropic SDK
+    from .extractors import AgenticExtractor, extract_many
+
     if not eml_files:
         click.echo("Error: No .eml files provided", err=True)
         click.echo("Usage: newsletter extract <file.eml> [<file2.eml> ...]")
@@ -65,27 +103,42 @@ def extract(eml_files, output_dir, verbose):
     try:
         extractor = AgenticExtractor(
             progress_callback=lambda msg: click.echo(f"  {msg}"),
-            verbose=verbose
+            verbose=verbose,
+            cache_dir=None if no_cache else EXTRACTION_CACHE_DIR,
+            requests_per_minute=rpm
         )
     except ValueError as e:
         click.echo(f"Error: {e}", err=True)
         click.echo("\nSet ANTHROPIC_API_KEY environment variable or use .env file")
         sys.exit(1)
 
+    # Submit everything up front in batch mode
+    batch_results = None
+    if batch:
+        click.echo(f"\n📦 Submitting {len(eml_files)} file(s) to the Message Batches API...")
+        batch_results = extractor.extract_batch_offline(eml_files)
+    elif max_workers > 1 and len(eml_files) > 1:
+        click.echo(f"\n⚡ Extracting {len(eml_files)} file(s) with {max_workers} workers...")
+        batch_results = extract_many(extractor, eml_files, max_workers=max_workers)
+
     # Process each file
     success_count = 0
-    for eml_file in eml_files:
+    for i, eml_file in enumerate(eml_files):
         eml_path = Path(eml_file)
         click.echo(f"\n📧 Processing: {eml_path.name}")
 
         try:
             # Extract
-            result = extractor.extract(eml_path)
+            if batch_results is None:
+                result = extractor.extract(eml_path)
+            else:
+                result = batch_results[i]
+                if isinstance(result, Exception):
+                    raise result
 
             # Save result
             output_file = output_path / f"{eml_path.stem}_extraction.json"
-            with open(output_file, 'w') as f:
-                json.dump(result, f, indent=2)
+            write_json(output_file, result)
 
             click.echo(f"✓ Saved to: {output_file}")
 
@@ -161,8 +214,7 @@ def show(extraction_file):
     Example:
         newsletter show data/extractions/the_batch_extraction.json
     """
-    with open(extraction_file) as f:
-        data = json.load(f)
+    data = read_json(Path(extraction_file))
 
     click.echo("\n" + "=" * 60)
     click.echo("NEWSLETTER EXTRACTION")
@@ -234,7 +286,9 @@ def test():
 @click.option('--max-emails', '-n', default=10, help='Maximum emails to process per newsletter')
 @click.option('--dry-run', is_flag=True, help='Preview what would be processed without making changes')
 @click.option('--force', is_flag=True, help='Reprocess emails even if already in database')
-def run(max_emails, dry_run, force):
+@click.option('--async-batch', is_flag=True,
+              help='Submit extractions as Message Batches and collect them on a later run')
+def run(max_emails, dry_run, force, async_batch):
     """Run the full pipeline: fetch → extract → upload.
 
     This command orchestrates the complete newsletter processing workflow:
@@ -248,6 +302,7 @@ def run(max_emails, dry_run, force):
         newsletter run -n 5               # Process up to 5 new emails
         newsletter run --dry-run          # Preview without processing
         newsletter run --force            # Reprocess all emails
+        newsletter run --async-batch      # Cheaper batch extraction (results next run)
     """
     click.echo("=" * 60)
     click.echo("NEWSLETTER PIPELINE")
@@ -269,11 +324,14 @@ def run(max_emails, dry_run, force):
         click.echo("❌ Newsletter config not found: config/newsletters.yaml", err=True)
         sys.exit(1)
 
-    with open(config_path) as f:
-        config = yaml.safe_load(f)
+    config = load_yaml(config_path)
+    newsletters_config = load_yaml(newsletters_path)
 
-    with open(newsletters_path) as f:
-        newsletters_config = yaml.safe_load(f)
+    # Heavy SDKs (Google API client, Notion, Anthropic) are only loaded for a run
+    from .connectors.gmail import GmailConnector
+    from .connectors.notion import NotionConnector
+    from .extractors import AgenticExtractor
+    from .storage import Database
 
     # Initialize components
     click.echo("\n🔧 Initializing components...")
@@ -301,7 +359,8 @@ def run(max_emails, dry_run, force):
         extractor = AgenticExtractor(
             api_key=anthropic_config.get('api_key'),
             progress_callback=lambda msg: click.echo(f"    {msg}"),
-            verbose=False
+            verbose=False,
+            cache_dir=None if force else EXTRACTION_CACHE_DIR
         )
         click.echo("  ✓ Extractor initialized")
 
@@ -310,6 +369,71 @@ def run(max_emails, dry_run, force):
         logger.exception("Failed to initialize components")
         sys.exit(1)
 
+    def save_and_upload(message_id, extraction_result, newsletter_db_id, stories_db_id):
+        """Save an extraction, upload it to Notion, and record each step."""
+        # Save extraction to file
+        extraction_dir = Path("data/extractions")
+        extraction_dir.mkdir(parents=True, exist_ok=True)
+        extraction_path = extraction_dir / f"{message_id}_extraction.json"
+
+        write_json(extraction_path, extraction_result)
+
+        # Recorded on the writer thread while the Notion upload runs
+        tokens_used = extraction_result.get('_metadata', {}).get('total_tokens', 0)
+        db.enqueue_extracted(message_id, str(extraction_path), tokens_used)
+
+        click.echo(f"    💾 Extracted ({tokens_used:,} tokens)")
+
+        # Upload to Notion
+        click.echo(f"    ⬆️  Uploading to Notion...")
+        page_id = notion.create_newsletter_page(
+            extraction_result,
+            database_id=newsletter_db_id
+        )
+
+        # Upload stories
+        stories = extraction_result.get('stories', [])
+        if stories and stories_db_id:
+            notion.create_story_pages(
+                newsletter_page_id=page_id,
+                stories=stories,
+                database_id=stories_db_id
+            )
+
+        db.mark_uploaded(message_id, page_id)
+
+    def finish(message_id, extraction_result, newsletter_db_id, stories_db_id) -> bool:
+        """Save and upload a batch or cached extraction result; return whether it succeeded."""
+        click.echo(f"\n  Finishing {message_id[:12]}...")
+        try:
+            if isinstance(extraction_result, Exception):
+                raise extraction_result
+            save_and_upload(message_id, extraction_result, newsletter_db_id, stories_db_id)
+        except Exception as e:
+            record_failure(message_id, e)
+            return False
+
+        click.echo(f"    ✅ Completed successfully")
+        return True
+
+    def record_failure(message_id, error):
+        """Report a failed message and mark it failed in the database."""
+        click.echo(f"    ❌ Failed: {error}", err=True)
+        logger.exception(f"Failed to process message {message_id}")
+
+        # A failed queued write is raised by the next flush; surface it here so
+        # it can't abort marking this message
+        try:
+            db.flush()
+        except Exception as e:
+            click.echo(f"    ⚠️  Earlier database write failed: {e}", err=True)
+
+        # Mark as failed in database
+        try:
+            db.mark_failed(message_id, str(error))
+        except Exception:
+            logger.exception(f"Could not mark message {message_id} as failed")
+
     # Process each newsletter in whitelist
     newsletters = newsletters_config.get('newsletters', [])
     if not newsletters:
@@ -381,6 +505,26 @@ def run(max_emails, dry_run, force):
             click.echo(f"  💾 Using database set: {database_set_name}")
 
         try:
+            # Collect Message Batches submitted by earlier runs
+            if async_batch and not dry_run:
+                submitted = db.get_submitted_newsletters(email)
+                for batch_id in dict.fromkeys(row['batch_id'] for row in submitted):
+                    eml_paths = {
+                        row['message_id']: row['eml_path']
+                        for row in submitted if row['batch_id'] == batch_id
+                    }
+                    batch_results = extractor.collect_extractions(batch_id, eml_paths)
+                    if batch_results is None:
+                        click.echo(f"  ⏳ Batch {batch_id} still processing ({len(eml_paths)} email(s))")
+                        continue
+
+                    click.echo(f"  📦 Collected batch {batch_id} ({len(eml_paths)} email(s))")
+                    for message_id, extraction_result in batch_results.items():
+                        if finish(message_id, extraction_result, newsletter_db_id, stories_db_id):
+                            total_processed += 1
+                        else:
+                            total_failed += 1
+
             # Get last processed date for smart querying
             since_date = None
             if not force:
@@ -404,6 +548,7 @@ def run(max_emails, dry_run, force):
             click.echo(f"  📨 Found {len(message_ids)} email(s)")
 
             # Process each message
+            to_submit = {}
             for i, message_id in enumerate(message_ids, 1):
                 click.echo(f"\n  [{i}/{len(message_ids)}] Processing {message_id[:12]}...")
 
@@ -420,72 +565,60 @@ def run(max_emails, dry_run, force):
                 try:
                     # Download email
                     click.echo(f"    ⬇️  Downloading...")
-                    eml_path, metadata = gmail.download_message(
-                        message_id,
-                        output_dir="data/newsletters"
-                    )
-
-                    # Add to database
-                    db.add_newsletter(
-                        message_id=message_id,
-                        sender_email=email,
-                        subject=metadata.get('subject'),
-                        received_date=metadata.get('date')
-                    )
-                    db.mark_downloaded(message_id, str(eml_path))
+                    eml_path = Path("data/newsletters") / f"{message_id}.eml"
+                    metadata = gmail.download_message(message_id, str(eml_path))
+
+                    # Add to database (one transaction for both updates)
+                    with db.batch():
+                        db.add_newsletter(
+                            message_id=message_id,
+                            sender_email=email,
+                            subject=metadata.get('subject'),
+                            received_date=metadata.get('date')
+                        )
+                        db.mark_downloaded(message_id, str(eml_path))
+
+                    # Defer extraction to a Message Batch
+                    if async_batch:
+                        to_submit[message_id] = str(eml_path)
+                        click.echo(f"    📦 Queued for batch extraction")
+                        continue
 
                     # Extract insights
                     click.echo(f"    🧠 Extracting insights...")
                     extraction_result = extractor.extract(eml_path)
 
-                    # Save extraction to file
-                    extraction_dir = Path("data/extractions")
-                    extraction_dir.mkdir(parents=True, exist_ok=True)
-                    extraction_path = extraction_dir / f"{message_id}_extraction.json"
-
-                    with open(extraction_path, 'w') as f:
-                        json.dump(extraction_result, f, indent=2)
-
-                    tokens_used = extraction_result.get('_metadata', {}).get('total_tokens', 0)
-                    db.mark_extracted(message_id, str(extraction_path), tokens_used)
-
-                    click.echo(f"    💾 Extracted ({tokens_used:,} tokens)")
-
-                    # Upload to Notion
-                    click.echo(f"    ⬆️  Uploading to Notion...")
-                    page_id = notion.create_newsletter_page(
-                        extraction_result,
-                        database_id=newsletter_db_id
-                    )
-
-                    # Upload stories
-                    stories = extraction_result.get('stories', [])
-                    if stories and stories_db_id:
-                        for story in stories:
-                            notion.create_story_page(
-                                story,
-                                database_id=stories_db_id,
-                                newsletter_page_id=page_id
-                            )
-
-                    db.mark_uploaded(message_id, page_id)
+                    save_and_upload(message_id, extraction_result, newsletter_db_id, stories_db_id)
 
                     click.echo(f"    ✅ Completed successfully")
                     total_processed += 1
 
                 except Exception as e:
-                    click.echo(f"    ❌ Failed: {e}", err=True)
-                    logger.exception(f"Failed to process message {message_id}")
-
-                    # Mark as failed in database
-                    try:
-                        db.mark_failed(message_id, str(e))
-                    except:
-                        pass
-
+                    record_failure(message_id, e)
                     total_failed += 1
                     continue
 
+            if to_submit:
+                click.echo(f"\n  📦 Submitting {len(to_submit)} email(s) as a Message Batch...")
+                try:
+                    batch_id, cached = extractor.submit_extractions(to_submit)
+                except Exception as e:
+                    for message_id in to_submit:
+                        record_failure(message_id, e)
+                    total_failed += len(to_submit)
+                    continue
+
+                # Emails extracted before were served from the cache, not submitted
+                for message_id, extraction_result in cached.items():
+                    if finish(message_id, extraction_result, newsletter_db_id, stories_db_id):
+                        total_processed += 1
+                    else:
+                        total_failed += 1
+
+                if batch_id is not None:
+                    db.mark_submitted([m for m in to_submit if m not in cached], batch_id)
+                    click.echo(f"  ✓ Submitted batch {batch_id}; run again with --async-batch to collect it")
+
         except Exception as e:
             click.echo(f"\n❌ Error processing {name}: {e}", err=True)
             logger.exception(f"Failed to process newsletter {name}")
@@ -501,14 +634,16 @@ def run(max_emails, dry_run, force):
 
     if not dry_run:
         # Show database stats
+        db.flush()
         stats = db.get_stats()
         click.echo(f"\n📊 Database Stats:")
         click.echo(f"  Total newsletters: {stats['total']}")
         click.echo(f"  By status: {stats.get('by_status', {})}")
         click.echo(f"  Total tokens used: {stats['total_tokens']:,}")
 
-    # Close database
+    # Close database and Notion connections
     db.close()
+    notion.close()
 
     click.echo(f"\n✨ Pipeline complete!\n")
 
@@ -1,18 +1,24 @@
 """Gmail API connector for fetching newsletters."""
 
 import base64
-import email
+import functools
 import logging
 import os
 import pickle
+from email.message import Message
+from email.parser import BytesHeaderParser
 from pathlib import Path
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
+from googleapiclient.model import JsonModel
+
+from .._compat import loads as json_loads
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +28,35 @@ logger = logging.getLogger(__name__)
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
 
+@functools.lru_cache(maxsize=1)
+def _gmail_discovery_doc() -> Optional[dict]:
+    """
+    Load and parse the bundled Gmail discovery document once per process.
+
+    Returns:
+        Parsed discovery document, or None if the client library doesn't ship it
+    """
+    doc = get_static_doc('gmail', 'v1')
+    if not doc:
+        return None
+    return json_loads(doc)
+
+
+class OrjsonModel(JsonModel):
+    """
+    JSON model that decodes API responses with orjson (when installed).
+
+    Request bodies are still serialized by the stock JsonModel, so only the
+    (much larger) response parsing path changes.
+    """
+
+    def deserialize(self, content):
+        body = json_loads(content)
+        if self._data_wrapper and 'data' in body:
+            body = body['data']
+        return body
+
+
 class GmailConnector:
     """Connect to Gmail API to fetch and manage newsletters."""
 
@@ -37,6 +72,7 @@ class GmailConnector:
         self.token_path = Path(token_path)
         self.service = None
         self.creds = None
+        self._labels_by_name: Optional[Dict[str, str]] = None
 
     def authenticate(self) -> None:
         """
@@ -69,14 +105,56 @@ class GmailConnector:
                 self.creds = flow.run_local_server(port=8080)
 
             # Save credentials for next run
-            logger.info(f"Saving token to {self.token_path}")
-            with open(self.token_path, 'w') as token:
-                token.write(self.creds.to_json())
-
-        # Build Gmail service
-        self.service = build('gmail', 'v1', credentials=self.creds)
+            self._save_token(self.creds.to_json())
+
+        # Build Gmail service from the cached discovery document (no network fetch)
+        discovery_doc = _gmail_discovery_doc()
+        if discovery_doc:
+            self.service = build_from_document(
+                discovery_doc, credentials=self.creds, model=OrjsonModel()
+            )
+        else:
+            self.service = build(
+                'gmail', 'v1',
+                credentials=self.creds,
+                model=OrjsonModel(),
+                static_discovery=True,
+                cache_discovery=False
+            )
         logger.info("✓ Gmail API authenticated successfully")
 
+    def _save_token(self, token_json: str) -> None:
+        """
+        Atomically write the OAuth token to disk.
+
+        Writes to a temporary file and renames it over the token path, so a
+        crash mid-write never leaves a truncated token behind. Skips the write
+        entirely if the token on disk is already identical.
+
+        Args:
+            token_json: Serialized credentials JSON
+        """
+        if self.token_path.exists() and self.token_path.read_text() == token_json:
+            logger.debug("Token unchanged, skipping write")
+            return
+
+        logger.info(f"Saving token to {self.token_path}")
+        self.token_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.token_path.with_suffix('.tmp')
+
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'w') as token:
+                if hasattr(os, 'fchmod'):
+                    os.fchmod(token.fileno(), 0o600)
+                token.write(token_json)
+                token.flush()
+                os.fsync(token.fileno())
+            os.replace(tmp_path, self.token_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
     def search_newsletters(
         self,
         sender_email: str,
@@ -113,7 +191,8 @@ class GmailConnector:
             results = self.service.users().messages().list(
                 userId='me',
                 q=query,
-                maxResults=max_results
+                maxResults=max_results,
+                fields='messages/id'
             ).execute()
 
             messages = results.get('messages', [])
@@ -130,6 +209,9 @@ class GmailConnector:
         """
         Download a message as .eml file.
 
+        If the .eml file already exists and is non-empty, the download is
+        skipped and metadata is read from the saved file's headers.
+
         Args:
             message_id: Gmail message ID
             output_path: Path to save .eml file
@@ -140,6 +222,13 @@ class GmailConnector:
         if not self.service:
             raise RuntimeError("Not authenticated. Call authenticate() first.")
 
+        output_file = Path(output_path)
+        if output_file.exists() and output_file.stat().st_size > 0:
+            logger.info(f"Already downloaded, reusing {output_file}")
+            with open(output_file, 'rb') as f:
+                msg = BytesHeaderParser().parse(f)
+            return self._build_metadata(message_id, msg, output_file)
+
         try:
             # Get the full message
             message = self.service.users().messages().get(
@@ -151,23 +240,22 @@ class GmailConnector:
             # Decode the raw message
             msg_bytes = base64.urlsafe_b64decode(message['raw'])
 
-            # Save as .eml file
-            output_file = Path(output_path)
+            # Save as .eml file via a temp file, so an interrupted write never
+            # leaves a truncated .eml that later runs would reuse
             output_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = output_file.with_suffix('.eml.tmp')
 
-            with open(output_file, 'wb') as f:
-                f.write(msg_bytes)
+            try:
+                with open(tmp_file, 'wb') as f:
+                    f.write(msg_bytes)
+                os.replace(tmp_file, output_file)
+            except BaseException:
+                tmp_file.unlink(missing_ok=True)
+                raise
 
-            # Parse for metadata
-            msg = email.message_from_bytes(msg_bytes)
-            metadata = {
-                'message_id': message_id,
-                'subject': msg.get('Subject', ''),
-                'from': msg.get('From', ''),
-                'date': msg.get('Date', ''),
-                'to': msg.get('To', ''),
-                'file_path': str(output_file)
-            }
+            # Parse headers only for metadata (the body is never needed here)
+            msg = BytesHeaderParser().parsebytes(msg_bytes)
+            metadata = self._build_metadata(message_id, msg, output_file)
 
             logger.info(f"Downloaded: {metadata['subject']}")
             return metadata
@@ -176,6 +264,18 @@ class GmailConnector:
             logger.error(f"Failed to download message {message_id}: {error}")
             raise
 
+    @staticmethod
+    def _build_metadata(message_id: str, msg: Message, output_file: Path) -> dict:
+        """Build the metadata dict returned by download_message."""
+        return {
+            'message_id': message_id,
+            'subject': msg.get('Subject', ''),
+            'from': msg.get('From', ''),
+            'date': msg.get('Date', ''),
+            'to': msg.get('To', ''),
+            'file_path': str(output_file)
+        }
+
     def mark_as_processed(self, message_id: str, label_name: str = "Newsletters/Processed") -> None:
         """
         Mark message as processed (readonly mode - no-op).
@@ -205,14 +305,15 @@ class GmailConnector:
         Returns:
             Label ID
         """
-        # List existing labels
-        results = self.service.users().labels().list(userId='me').execute()
-        labels = results.get('labels', [])
+        # Check cached labels first, refreshing from the API on a miss
+        label_id = (self._labels_by_name or {}).get(label_name)
+        if label_id:
+            return label_id
 
-        # Check if label exists
-        for label in labels:
-            if label['name'] == label_name:
-                return label['id']
+        self._labels_by_name = self._list_labels()
+        label_id = self._labels_by_name.get(label_name)
+        if label_id:
+            return label_id
 
         # Create new label
         logger.info(f"Creating new label: {label_name}")
@@ -227,10 +328,24 @@ class GmailConnector:
             body=label_object
         ).execute()
 
+        self._labels_by_name[label_name] = created_label['id']
         return created_label['id']
 
+    def _list_labels(self) -> Dict[str, str]:
+        """Fetch all labels as a {name: id} mapping."""
+        results = self.service.users().labels().list(
+            userId='me',
+            fields='labels(id,name)'
+        ).execute()
+        return {label['name']: label['id'] for label in results.get('labels', [])}
+
     def get_message_count(self, sender_email: str) -> int:
-        """Get total count of messages from a sender."""
+        """
+        Get approximate count of messages from a sender.
+
+        Note: Gmail's resultSizeEstimate is an estimate, not an exact count.
+        Only that field is requested, so the response is a few bytes.
+        """
         if not self.service:
             raise RuntimeError("Not authenticated. Call authenticate() first.")
 
@@ -238,7 +353,8 @@ class GmailConnector:
         results = self.service.users().messages().list(
             userId='me',
             q=query,
-            maxResults=1
+            maxResults=1,
+            fields='resultSizeEstimate'
         ).execute()
 
         return results.get('resultSizeEstimate', 0)
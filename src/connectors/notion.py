@@ -1,30 +1,172 @@
 """Notion API connector for storing newsletter insights."""
 
+import asyncio
+import contextlib
+import contextvars
 import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Optional, List, Dict
 
-from notion_client import Client
-from notion_client.errors import APIResponseError
+import httpx
+from notion_client import AsyncClient, Client
+from notion_client.errors import APIResponseError, HTTPResponseError
+
+from .._compat import HTTP2_AVAILABLE, dumps as json_dumps, loads as json_loads
 
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by all requests from one connector
+HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=20,
+    max_connections=20,
+    keepalive_expiry=60.0
+)
+HTTP_TIMEOUT_MS = 30_000
+
+# (connector, AsyncClient) for the running _async_client_scope
+_async_client: contextvars.ContextVar = contextvars.ContextVar('_async_client', default=None)
+
+# Transient statuses worth retrying (rate limit and gateway errors)
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+MAX_RETRY_ATTEMPTS = 5
+
+# Story fields that map to Stories database properties (Title always exists)
+_FIELD_TO_PROPERTY = {
+    'category': "Category",
+    'companies': "Companies",
+    'key_facts': "Key Facts",
+    'google_implications': "Google Implications",
+    'confidence': "Confidence",
+}
+_MULTI_SELECT_FIELDS = frozenset({'companies'})
+_SELECT_FIELDS = frozenset({'category', 'confidence'})
+
+
+def _clip(value, limit: int):
+    """Truncate a string or list to limit, returning it unchanged (no copy) if already short."""
+    return value if len(value) <= limit else value[:limit]
+
+
+def _rt(text: str) -> dict:
+    """Build a rich_text property value."""
+    return {"rich_text": [{"text": {"content": _clip(text, 2000)}}]}
+
+
+def _sel(name: str) -> dict:
+    """Build a select property value."""
+    return {"select": {"name": name}}
+
+
+def _ms(names: List[str]) -> dict:
+    """Build a multi_select property value."""
+    return {"multi_select": [{"name": name} for name in _clip(names, 10)]}
+
+
+# Builders for story fields that are only written when present in the story
+_OPTIONAL_STORY_BUILDERS = {
+    'companies': lambda story: ("Companies", _ms(story['companies'])),
+    'key_facts': lambda story: ("Key Facts", _rt("\n".join(story['key_facts']))),
+    'google_implications': lambda story: ("Google Implications", _rt(story['google_implications'])),
+}
+
+
+def _retry_delay(error: HTTPResponseError, attempt: int) -> Optional[float]:
+    """
+    Compute how long to wait before retrying a failed request.
+
+    Returns:
+        Delay in seconds, or None if the error is not retryable
+    """
+    if error.status not in RETRYABLE_STATUSES:
+        return None
+
+    try:
+        retry_after = float(error.headers.get("Retry-After", 1.0))
+    except (TypeError, ValueError):
+        retry_after = 1.0
+
+    return retry_after * 2 ** attempt + random.uniform(0, 0.5)
+
 
 class NotionConnector:
     """Connect to Notion API to store newsletter insights."""
 
-    def __init__(self, api_key: str, database_ids: Optional[Dict[str, str]] = None):
+    def __init__(
+        self,
+        api_key: str,
+        database_ids: Optional[Dict[str, str]] = None,
+        concurrency: int = 5
+    ):
         """
         Initialize Notion connector.
 
         Args:
             api_key: Notion integration token (starts with "secret_")
             database_ids: Dict with keys: "newsletters", "stories", "trends"
+            concurrency: Max parallel page creations (Notion allows ~3 req/s on average)
         """
-        self.client = Client(auth=api_key)
+        # Persistent HTTP client so back-to-back requests reuse TLS connections
+        self._timeout = httpx.Timeout(HTTP_TIMEOUT_MS / 1000, connect=10.0)
+        self._http = httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=self._timeout)
+
+        self.client = Client(auth=api_key, client=self._http, timeout_ms=HTTP_TIMEOUT_MS)
         self.database_ids = database_ids or {}
+        self.concurrency = concurrency
+        self._schema_cache: Dict[str, set] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
         logger.info("Notion client initialized")
 
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Worker pool for concurrent requests, shared across calls until close()."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.concurrency,
+                thread_name_prefix="notion"
+            )
+        return self._executor
+
+    @property
+    def aclient(self) -> AsyncClient:
+        """Async SDK client of the enclosing _async_client_scope."""
+        scope = _async_client.get()
+        if scope is None or scope[0] is not self:
+            raise RuntimeError("Async client used outside _async_client_scope()")
+        return scope[1]
+
+    @contextlib.asynccontextmanager
+    async def _async_client_scope(self):
+        """
+        Provide an async SDK client for the duration of a block.
+
+        Pooled connections belong to the event loop that opened them, so each
+        scope opens its own client and closes it on exit. Nested scopes reuse
+        the outer client.
+        """
+        scope = _async_client.get()
+        if scope is not None and scope[0] is self:
+            yield
+            return
+
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=HTTP_LIMITS,
+            timeout=self._timeout
+        ) as http_client:
+            client = AsyncClient(
+                auth=self.client.options.auth,
+                client=http_client,
+                timeout_ms=HTTP_TIMEOUT_MS
+            )
+            token = _async_client.set((self, client))
+            try:
+                yield
+            finally:
+                _async_client.reset(token)
+
     def create_newsletter_database(self, parent_page_id: Optional[str] = None) -> str:
         """
         Create the Newsletter Insights database.
@@ -143,37 +285,63 @@ class NotionConnector:
         Returns:
             Page ID
         """
+        properties = self._build_newsletter_properties(extraction_result)
+
+        # Create page
+        page = self._retry(
+            self.client.pages.create,
+            parent={"database_id": database_id},
+            properties=properties
+        )
+
+        page_id = page["id"]
+        logger.info(f"✓ Created newsletter page: {page_id}")
+        return page_id
+
+    async def acreate_newsletter_page(self, extraction_result: dict, database_id: str) -> str:
+        """Async variant of create_newsletter_page."""
+        properties = self._build_newsletter_properties(extraction_result)
+
+        async with self._async_client_scope():
+            page = await self._aretry(
+                self.aclient.pages.create,
+                parent={"database_id": database_id},
+                properties=properties
+            )
+
+        page_id = page["id"]
+        logger.info(f"✓ Created newsletter page: {page_id}")
+        return page_id
+
+    def _build_newsletter_properties(self, extraction_result: dict) -> dict:
+        """
+        Build Notion page properties for a newsletter.
+
+        Args:
+            extraction_result: The extraction JSON from AgenticExtractor
+
+        Returns:
+            Properties dict for pages.create
+        """
         # Parse metadata
         metadata = extraction_result.get('_metadata', {})
         source_file = metadata.get('source_file', '')
         source_name = "The Batch" if "batch" in source_file.lower() else "Other"
+        now_iso = datetime.now().isoformat()
 
-        # Build properties
-        properties = {
+        return {
             "Title": {
-                "title": [{"text": {"content": extraction_result.get('executive_summary', '')[:100]}}]
-            },
-            "Source": {"select": {"name": source_name}},
-            "Date": {"date": {"start": datetime.now().isoformat()}},
-            "Executive Summary": {
-                "rich_text": [{"text": {"content": extraction_result.get('executive_summary', '')[:2000]}}]
+                "title": [{"text": {"content": _clip(extraction_result.get('executive_summary', ''), 100)}}]
             },
+            "Source": _sel(source_name),
+            "Date": {"date": {"start": now_iso}},
+            "Executive Summary": _rt(extraction_result.get('executive_summary', '')),
             "Stories Count": {"number": len(extraction_result.get('stories', []))},
-            "Status": {"select": {"name": "Ready"}},
-            "Processed At": {"date": {"start": datetime.now().isoformat()}},
+            "Status": _sel("Ready"),
+            "Processed At": {"date": {"start": now_iso}},
             "Token Cost": {"number": metadata.get('total_tokens', 0)}
         }
 
-        # Create page
-        page = self.client.pages.create(
-            parent={"database_id": database_id},
-            properties=properties
-        )
-
-        page_id = page["id"]
-        logger.info(f"✓ Created newsletter page: {page_id}")
-        return page_id
-
     def create_story_pages(
         self,
         newsletter_page_id: str,
@@ -189,45 +357,277 @@ class NotionConnector:
             database_id: Stories database ID
 
         Returns:
-            List of created page IDs
-        """
-        page_ids = []
-
-        for story in stories:
-            # Build properties
-            properties = {
-                "Title": {
-                    "title": [{"text": {"content": story.get('title', 'Untitled')[:100]}}]
-                },
-                "Category": {
-                    "select": {"name": story.get('category', 'research')}
-                },
-                "Companies": {
-                    "multi_select": [{"name": company} for company in story.get('companies', [])[:10]]
-                },
-                "Key Facts": {
-                    "rich_text": [{"text": {"content": "\n".join(story.get('key_facts', []))[:2000]}}]
-                },
-                "Google Implications": {
-                    "rich_text": [{"text": {"content": story.get('google_implications', '')[:2000]}}]
-                },
-                "Confidence": {
-                    "select": {"name": story.get('confidence', 'medium').capitalize()}
-                }
-            }
+            List of created page IDs (in story order)
 
-            # Create page
-            page = self.client.pages.create(
-                parent={"database_id": database_id},
-                properties=properties
-            )
+        Raises:
+            RuntimeError: If any story page could not be created (the other
+                pages are still created, and each failure is logged)
+        """
+        if not stories:
+            return []
+
+        self._ensure_database_properties(database_id, stories)
 
-            page_ids.append(page["id"])
-            logger.info(f"  ✓ Created story: {story.get('title', 'Untitled')[:50]}")
+        properties_list = [self._build_story_properties(story) for story in stories]
+        results = self._bulk_create_pages(database_id, properties_list)
+        return self._story_page_ids(results)
 
+    @staticmethod
+    def _story_page_ids(results: List[Optional[str]]) -> List[str]:
+        """Return the created story page IDs, raising if any story failed."""
+        page_ids = [page_id for page_id in results if page_id]
         logger.info(f"Created {len(page_ids)} story pages")
+
+        failed = len(results) - len(page_ids)
+        if failed:
+            raise RuntimeError(f"Failed to create {failed} of {len(results)} story pages")
         return page_ids
 
+    def _bulk_create_pages(
+        self,
+        database_id: str,
+        properties_list: List[dict]
+    ) -> List[Optional[str]]:
+        """
+        Create many pages in a database.
+
+        Notion has no batch page-creation endpoint, so payloads are serialized
+        up front, deduplicated, and POSTed concurrently over the shared pool.
+
+        Args:
+            database_id: Target database ID
+            properties_list: Page properties, one dict per page
+
+        Returns:
+            Page IDs aligned with properties_list (None where creation failed;
+            identical payloads share the ID of the first one created)
+        """
+        seen: Dict[bytes, int] = {}
+        unique_payloads = []
+        unique_titles = []
+        input_to_unique = []
+        for properties in properties_list:
+            # Sorted keys, so equal payloads serialize to equal bytes
+            payload = json_dumps(
+                {"parent": {"database_id": database_id}, "properties": properties},
+                sort_keys=True
+            )
+            if payload not in seen:
+                seen[payload] = len(unique_payloads)
+                unique_payloads.append(payload)
+                title_parts = properties.get("Title", {}).get("title") or [{}]
+                unique_titles.append(title_parts[0].get("text", {}).get("content", "Untitled")[:50])
+            input_to_unique.append(seen[payload])
+
+        dup_count = len(properties_list) - len(unique_payloads)
+        if dup_count:
+            logger.info(f"Deduplicated {dup_count} pages")
+
+        def create(index: int) -> Optional[str]:
+            title = unique_titles[index]
+            try:
+                page_id = self._retry(self._raw_create_page, unique_payloads[index])
+            except HTTPResponseError as e:
+                logger.error(f"  ✗ Failed to create page '{title}': {e}")
+                return None
+
+            logger.info(f"  ✓ Created page: {title}")
+            return page_id
+
+        # Pages are independent, so create them in parallel (results keep input order)
+        results = list(self.executor.map(create, range(len(unique_payloads))))
+
+        return [results[i] for i in input_to_unique]
+
+    def _raw_create_page(self, payload_bytes: bytes) -> str:
+        """
+        Create a page from a pre-serialized JSON payload.
+
+        Args:
+            payload_bytes: JSON body for POST /v1/pages
+
+        Returns:
+            Page ID
+
+        Raises:
+            HTTPResponseError: If Notion returns an error response
+                (APIResponseError when the body carries a Notion error code)
+        """
+        # The SDK already set base_url, Authorization and Notion-Version on self._http
+        response = self._http.post(
+            "pages",
+            content=payload_bytes,
+            headers={"Content-Type": "application/json"}
+        )
+
+        if response.is_error:
+            try:
+                body = json_loads(response.content)
+            except ValueError:
+                raise HTTPResponseError(response)
+            raise APIResponseError(
+                response,
+                body.get("message", response.text),
+                body.get("code", "unknown")
+            )
+
+        return json_loads(response.content)["id"]
+
+    async def acreate_story_pages(
+        self,
+        newsletter_page_id: str,
+        stories: List[dict],
+        database_id: str
+    ) -> List[str]:
+        """
+        Async variant of create_story_pages.
+
+        Requests are fanned out with asyncio.gather, bounded by a semaphore
+        of size self.concurrency.
+        """
+        if not stories:
+            return []
+
+        await asyncio.to_thread(self._ensure_database_properties, database_id, stories)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def create(story: dict) -> Optional[str]:
+            title = story.get('title', 'Untitled')[:50]
+            async with semaphore:
+                try:
+                    page = await self._aretry(
+                        self.aclient.pages.create,
+                        parent={"database_id": database_id},
+                        properties=self._build_story_properties(story)
+                    )
+                except HTTPResponseError as e:
+                    logger.error(f"  ✗ Failed to create story '{title}': {e}")
+                    return None
+
+            logger.info(f"  ✓ Created story: {title}")
+            return page["id"]
+
+        async with self._async_client_scope():
+            results = await asyncio.gather(*(create(story) for story in stories))
+        return self._story_page_ids(results)
+
+    def _ensure_database_properties(self, database_id: str, stories: List[dict]) -> None:
+        """
+        Add any story properties missing from the Stories database schema.
+
+        The schema is fetched once per database and cached; after a successful
+        update the cache is extended locally instead of being refetched.
+
+        Args:
+            database_id: Stories database ID
+            stories: Story dicts from extraction (fields are unioned across all of them)
+        """
+        fields = set().union(*(story.keys() for story in stories)) & _FIELD_TO_PROPERTY.keys()
+
+        # Fast path: every needed property is already known to exist
+        existing_props = self._schema_cache.get(database_id)
+        if existing_props is not None and {_FIELD_TO_PROPERTY[f] for f in fields} <= existing_props:
+            return
+
+        try:
+            if existing_props is None:
+                db = self._retry(self.client.databases.retrieve, database_id=database_id)
+                existing_props = set(db.get("properties", {}).keys())
+                self._schema_cache[database_id] = existing_props
+
+            missing_props = {}
+            for field in fields:
+                prop_name = _FIELD_TO_PROPERTY[field]
+                if prop_name in existing_props:
+                    continue
+
+                if field in _MULTI_SELECT_FIELDS:
+                    missing_props[prop_name] = {"multi_select": {}}
+                elif field in _SELECT_FIELDS:
+                    missing_props[prop_name] = {"select": {}}
+                else:
+                    missing_props[prop_name] = {"rich_text": {}}
+
+            if missing_props:
+                logger.info(f"Adding missing properties to database: {', '.join(missing_props)}")
+                self._retry(
+                    self.client.databases.update,
+                    database_id=database_id,
+                    properties=missing_props
+                )
+                self._schema_cache[database_id] = existing_props | missing_props.keys()
+
+        except Exception as e:
+            logger.warning(f"Could not verify database properties: {e}")
+
+    def _retry(self, fn, *args, max_attempts: int = MAX_RETRY_ATTEMPTS, **kwargs):
+        """
+        Call a Notion API function, retrying transient failures.
+
+        Retries on 429/502/503/504 with exponential backoff, honoring the
+        Retry-After header. Other errors are raised immediately.
+        """
+        for attempt in range(max_attempts):
+            try:
+                return fn(*args, **kwargs)
+            except HTTPResponseError as e:
+                delay = _retry_delay(e, attempt)
+                if delay is None or attempt == max_attempts - 1:
+                    raise
+                logger.warning(f"Notion API returned {e.status}, retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    async def _aretry(self, fn, *args, max_attempts: int = MAX_RETRY_ATTEMPTS, **kwargs):
+        """Async variant of _retry for AsyncClient calls."""
+        for attempt in range(max_attempts):
+            try:
+                return await fn(*args, **kwargs)
+            except HTTPResponseError as e:
+                delay = _retry_delay(e, attempt)
+                if delay is None or attempt == max_attempts - 1:
+                    raise
+                logger.warning(f"Notion API returned {e.status}, retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+
+    def invalidate_schema_cache(self, database_id: Optional[str] = None) -> None:
+        """
+        Drop cached database schemas.
+
+        Args:
+            database_id: Database to invalidate (if None, clears all)
+        """
+        if database_id is None:
+            self._schema_cache.clear()
+        else:
+            self._schema_cache.pop(database_id, None)
+
+    def _build_story_properties(self, story: dict) -> dict:
+        """
+        Build Notion page properties for a story.
+
+        Args:
+            story: Story dict from extraction
+
+        Returns:
+            Properties dict for pages.create
+        """
+        # Fields with defaults are always written
+        properties = {
+            "Title": {
+                "title": [{"text": {"content": _clip(story.get('title', 'Untitled'), 100)}}]
+            },
+            "Category": _sel(story.get('category', 'research')),
+            "Confidence": _sel(story.get('confidence', 'medium').capitalize())
+        }
+
+        properties.update(
+            _OPTIONAL_STORY_BUILDERS[field](story)
+            for field in story.keys() & _OPTIONAL_STORY_BUILDERS.keys()
+        )
+
+        return properties
+
     def update_processing_status(
         self,
         page_id: str,
@@ -246,7 +646,7 @@ class NotionConnector:
             "Status": {"select": {"name": status}}
         }
 
-        self.client.pages.update(page_id=page_id, properties=properties)
+        self._retry(self.client.pages.update, page_id=page_id, properties=properties)
         logger.info(f"Updated page {page_id} status to: {status}")
 
     def test_connection(self) -> bool:
@@ -266,13 +666,30 @@ class NotionConnector:
             return False
 
     def get_database_info(self, database_id: str) -> dict:
-        """Get information about a database."""
+        """Get information about a database (also seeds the schema cache)."""
         try:
-            db = self.client.databases.retrieve(database_id=database_id)
+            db = self._retry(self.client.databases.retrieve, database_id=database_id)
+            properties = list(db.get("properties", {}).keys())
+            self._schema_cache[database_id] = set(properties)
             return {
                 "title": db.get("title", [{}])[0].get("plain_text", "Unknown"),
-                "properties": list(db.get("properties", {}).keys())
+                "properties": properties
             }
         except APIResponseError as e:
             logger.error(f"Failed to get database info: {e}")
             return {}
+
+    def close(self) -> None:
+        """Shut down the worker pool and close the underlying HTTP connection pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._http.close()
+
+    def __enter__(self):
+        """Context manager entry."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit."""
+        self.close()
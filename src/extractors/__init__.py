@@ -1,6 +1,6 @@
 """Newsletter content extractors."""
 
 from .base import BaseExtractor
-from .agentic import AgenticExtractor
+from .agentic import AgenticExtractor, RateLimiter, extract_many
 
-__all__ = ["BaseExtractor", "AgenticExtractor"]
+__all__ = ["BaseExtractor", "AgenticExtractor", "RateLimiter", "extract_many"]
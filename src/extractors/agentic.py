@@ -1,18 +1,358 @@
 """Agentic extractor using two-pass Claude analysis."""
 
-import json
+import asyncio
+import contextlib
+import contextvars
+import functools
+import hashlib
 import logging
 import os
-import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email import policy
+from email.parser import BytesParser
 from pathlib import Path
-from typing import Optional, Callable
+from typing import Optional, Callable, List
 
 import anthropic
+import httpx
+from bs4 import BeautifulSoup
 
+from .._compat import HTTP2_AVAILABLE, JSONDecodeError, dumps as _json_dumps, loads as _json_loads
 from .base import BaseExtractor
 
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by all extractors using the same API key
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=64)
+
+# (extractor, AsyncAnthropic) for the current async client scope; context-local,
+# so each event loop (and each thread running one) sees only its own client
+_async_client: contextvars.ContextVar = contextvars.ContextVar('_async_client', default=None)
+
+# JSON Schema for the structured extraction (mirrors the pass 2 prompt)
+EXTRACTION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "executive_summary": {"type": "string", "description": "3-4 sentences for a VP"},
+        "stories": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "category": {
+                        "type": "string",
+                        "enum": [
+                            "competitive_intelligence", "talent_market", "infrastructure",
+                            "product_development", "regulation", "research"
+                        ]
+                    },
+                    "key_facts": {"type": "array", "items": {"type": "string"}},
+                    "companies": {"type": "array", "items": {"type": "string"}},
+                    "google_implications": {"type": "string"},
+                    "confidence": {"type": "string", "enum": ["high", "medium", "low"]},
+                    "reasoning": {"type": "string"},
+                    "links_to_follow": {"type": "array", "items": {"type": "string"}}
+                },
+                "required": ["title", "category", "key_facts", "companies",
+                             "google_implications", "confidence"]
+            }
+        },
+        "trend_signals": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "trend": {"type": "string"},
+                    "evidence": {"type": "string"},
+                    "trajectory": {"type": "string", "enum": ["accelerating", "stable", "uncertain"]}
+                },
+                "required": ["trend", "evidence", "trajectory"]
+            }
+        },
+        "action_items": {"type": "array", "items": {"type": "string"}},
+        "analysis_notes": {"type": "string"}
+    },
+    "required": ["executive_summary", "stories", "trend_signals", "action_items"]
+}
+
+# Raw EML bytes read before cleaning (base64 images can make emails huge)
+MAX_RAW_EML_BYTES = 20 * 1024 * 1024
+
+# Headers kept in the cleaned email; DKIM, Received, etc. are dropped
+EML_HEADERS = ('From', 'To', 'Date', 'Subject')
+
+
+def _html_to_text(html: str) -> str:
+    """Strip tags, scripts and styles from an HTML body, keeping links as "text (url)"."""
+    soup = BeautifulSoup(html, 'lxml')
+    for tag in soup(['head', 'script', 'style']):
+        tag.decompose()
+
+    # Web links are what the analysis suggests following, so keep their targets
+    for link in soup.find_all('a', href=True):
+        href = link['href'].strip()
+        if not href.startswith(('http://', 'https://')):
+            continue
+        text = link.get_text(' ', strip=True)
+        link.replace_with(f"{text} ({href})" if text and text != href else href)
+
+    return soup.get_text('\n')
+
+
+def _clean_eml(raw: bytes) -> str:
+    """
+    Reduce a raw EML to its key headers and readable text.
+
+    Attachments, inline images and transport headers carry no information for
+    the analysis but dominate the token count. The text/plain body is used
+    when present; otherwise HTML bodies are converted to text.
+    """
+    msg = BytesParser(policy=policy.default).parsebytes(raw)
+
+    plain, html = [], []
+    for part in msg.walk():
+        if part.is_multipart() or part.is_attachment():
+            continue
+        content_type = part.get_content_type()
+        if content_type not in ('text/plain', 'text/html'):
+            continue
+
+        try:
+            body = part.get_content()
+        except (LookupError, UnicodeDecodeError):  # Unknown or wrong charset
+            body = part.get_payload(decode=True).decode('utf-8', errors='replace')
+        (plain if content_type == 'text/plain' else html).append(body)
+
+    bodies = plain or [_html_to_text(body) for body in html]
+    if not bodies:
+        # Not a parseable text email; fall back to the raw content
+        return raw.decode('utf-8', errors='replace')
+
+    headers = [f"{name}: {msg[name]}" for name in EML_HEADERS if msg[name]]
+    lines = (line.strip() for body in bodies for line in body.splitlines())
+    return "\n".join(headers) + "\n\n" + "\n".join(line for line in lines if line)
+
+
+@functools.lru_cache(maxsize=32)
+def _read_eml_cached(path: str, mtime_ns: int, max_chars: int) -> str:
+    """
+    Read an EML file, clean it, and truncate it to max_chars characters.
+
+    mtime_ns is part of the cache key so edited files are re-read.
+    """
+    with open(path, 'rb') as f:
+        raw = f.read(MAX_RAW_EML_BYTES)
+
+    # Normalize newlines as text-mode reading would
+    content = _clean_eml(raw).replace('\r\n', '\n').replace('\r', '\n')
+
+    if len(content) > max_chars:
+        logger.warning(f"Truncating email {Path(path).name} to {max_chars} chars")
+        content = content[:max_chars]
+
+    return content
+
+
+def _coerce(value, schema: dict):
+    """
+    Coerce a decoded JSON value to the shape described by a JSON Schema.
+
+    Scalars become strings or one-item lists, and missing or null arrays
+    become empty lists. Values that can't be coerced (nulls, a story that
+    isn't an object, a string outside its enum) become None: such object
+    fields are removed so consumers' defaults apply, and such array items
+    are dropped. No values are invented for missing strings.
+    """
+    kind = schema.get("type")
+    if value is None:
+        return [] if kind == "array" else None
+    if kind == "object":
+        if not isinstance(value, dict):
+            return None
+        required = schema.get("required", ())
+        for key, subschema in schema.get("properties", {}).items():
+            if key in value:
+                coerced = _coerce(value[key], subschema)
+            elif key in required:
+                coerced = _coerce(None, subschema)
+            else:
+                continue
+            if coerced is None:
+                value.pop(key, None)
+            else:
+                value[key] = coerced
+        return value
+    if kind == "array":
+        if not isinstance(value, list):
+            value = [value]
+        items = (_coerce(item, schema["items"]) for item in value)
+        return [item for item in items if item is not None]
+    if kind == "string":
+        if not isinstance(value, str):
+            value = str(value)
+        if "enum" in schema:
+            value = value.strip().lower()
+            return value if value in schema["enum"] else None
+        return value
+    return value
+
+
+# Without these the result isn't an extraction, even if it is valid JSON
+_ESSENTIAL_FIELDS = ('executive_summary', 'stories')
+
+
+def _coerce_extraction(data) -> Optional[dict]:
+    """Validate a parsed extraction against EXTRACTION_SCHEMA, or None if it isn't one."""
+    if not isinstance(data, dict) or any(data.get(key) is None for key in _ESSENTIAL_FIELDS):
+        return None
+    return _coerce(data, EXTRACTION_SCHEMA)
+
+
+def _strip_json_fence(text: str) -> Optional[str]:
+    """Return the contents of a ```json fenced block, or None if there isn't one."""
+    start = text.find('```json')
+    if start == -1:
+        return None
+
+    start += len('```json')
+    end = text.find('```', start)
+    if end == -1:
+        return None
+
+    return text[start:end].strip()
+
+
+def _find_json_object(text: str) -> Optional[str]:
+    """
+    Return the first balanced {...} object in text, or None.
+
+    Tracks brace depth while skipping over string literals (honoring
+    backslash escapes), so braces inside strings don't end the object early.
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_client(api_key: str) -> anthropic.Anthropic:
+    """
+    Return the process-wide Anthropic client for an API key.
+
+    Extractors created per run or per newsletter reuse its connection pool,
+    so both passes (and later newsletters) skip the TCP/TLS handshake.
+    """
+    http_client = anthropic.DefaultHttpxClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS)
+    return anthropic.Anthropic(api_key=api_key, http_client=http_client)
+
+
+class RateLimiter:
+    """
+    Sliding-window limit on API requests per period.
+
+    Usable from threads (acquire) and from coroutines (aacquire), including
+    several event loops in different threads sharing one limiter. Both paths
+    reserve a slot under a threading lock; the critical section never blocks
+    or awaits, so holding it briefly from a coroutine is safe.
+    """
+
+    def __init__(self, max_calls: int, period: float = 60.0):
+        self.max_calls = max_calls
+        self.period = period
+        self._calls: deque = deque()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Record a call if a slot is free; otherwise return seconds to wait."""
+        now = time.monotonic()
+        while self._calls and now - self._calls[0] >= self.period:
+            self._calls.popleft()
+        if len(self._calls) < self.max_calls:
+            self._calls.append(now)
+            return 0.0
+        return self.period - (now - self._calls[0])
+
+    def acquire(self) -> None:
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                wait = self._reserve()
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self) -> None:
+        """Wait (without blocking the event loop) until a request may be sent."""
+        while True:
+            with self._lock:
+                wait = self._reserve()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+def extract_many(
+    extractor: BaseExtractor,
+    eml_paths: List[str | Path],
+    max_workers: int = 8
+) -> List[dict | Exception]:
+    """
+    Run a synchronous extractor over many newsletters using a thread pool.
+
+    Extraction is dominated by waiting on the API, so threads give N-way
+    parallelism without asyncio. The Anthropic client is thread-safe.
+
+    Args:
+        extractor: Extractor to run (shared by all threads)
+        eml_paths: Paths to .eml files
+        max_workers: Max extractions in flight at once
+
+    Returns:
+        Results in input order; a failed extraction is returned as its exception
+    """
+    def extract_one(eml_path: str | Path) -> dict | Exception:
+        try:
+            return extractor.extract(eml_path)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(extract_one, eml_paths))
+
+
+EXTRACTION_TOOL = {
+    "name": "emit_extraction",
+    "description": "Emit the final structured analysis of the newsletter.",
+    "input_schema": EXTRACTION_SCHEMA
+}
+
 
 class AgenticExtractor(BaseExtractor):
     """
@@ -21,18 +361,125 @@ class AgenticExtractor(BaseExtractor):
     Pass 1: Analyze newsletter and reason through content
     Pass 2: Structure findings into JSON format
 
+    With mode="single_pass", both steps are fused into one call that returns
+    the JSON through a forced tool use. mode="speculative" runs both
+    strategies concurrently and keeps whichever first yields valid JSON.
+
     This is the production version of test2_agentic.py from experiments.
     """
 
     DEFAULT_MODEL = "claude-sonnet-4-20250514"
     MAX_EML_CHARS = 50000  # Truncate very long emails
+    EML_EXCERPT_CHARS = 2000  # EML context resent in pass 2
+    MODES = ("two_pass", "single_pass", "speculative")
+    PROMPT_VERSION = "2"  # Bump when prompts change to invalidate cached results
+    BATCH_POLL_SECONDS = 60  # Message Batches can take minutes to hours
+
+    # _metadata token counts, zeroed on cache hits
+    _TOKEN_METADATA_KEYS = (
+        'pass1_input_tokens', 'pass1_output_tokens', 'pass2_input_tokens',
+        'pass2_output_tokens', 'total_tokens'
+    )
+
+    SYSTEM_PROMPT = """You are an AI research analyst with access to tools.
+Your task is to analyze a newsletter email for a VP at Google.
+
+You should:
+1. First, understand the structure of the email (key headers, then its text content with links shown as "text (url)")
+2. Identify the main stories/sections
+3. For each story, extract key facts, companies mentioned, and implications
+4. Identify which links would be worth following for deeper context
+5. Synthesize into actionable insights
+
+Think step by step. Explain your reasoning as you analyze.
+
+The VP cares about:
+- Competitive moves by Meta, OpenAI, Microsoft, AWS
+- Talent market dynamics
+- Infrastructure investments
+- Technical trends
+- Strategic opportunities/threats for Google
+
+Be specific and actionable. Distinguish between confirmed facts and speculation."""
+
+    ANALYSIS_INSTRUCTIONS = """Please:
+1. Identify the email's sections from its headers and text
+2. Extract the main stories covered
+3. For each story, identify:
+   - Key facts and numbers
+   - Companies mentioned
+   - What this means for Google specifically
+   - Which links would be worth following for more detail
+4. Identify any trend signals across the stories
+5. Provide a final executive summary
+
+Think through this step by step, showing your reasoning."""
+
+    # EML blocks are EML_PREFIX (or EML_EXCERPT_PREFIX) + email + EML_SUFFIX,
+    # joined once so the (up to 50K char) email is copied a single time
+    EML_PREFIX = """Please analyze this newsletter email. It's from "The Batch" by DeepLearning.AI.
+
+Here is the email (key headers and text content; attachments and markup removed, links kept as "text (url)"):
+
+```
+"""
+
+    EML_EXCERPT_PREFIX = """Please analyze this newsletter email. It's from "The Batch" by DeepLearning.AI.
+
+Here is the beginning of the email (truncated; the full email was provided for your analysis):
+
+```
+"""
+
+    EML_SUFFIX = """
+```"""
+
+    # Pass 2 prompt is STRUCTURING_PREFIX + analysis + STRUCTURING_SUFFIX
+    STRUCTURING_PREFIX = """Based on your analysis above, now provide a structured JSON output.
+
+Your analysis:
+"""
+
+    STRUCTURING_SUFFIX = """
+
+Please provide the final output as JSON with this structure:
+
+{
+  "executive_summary": "3-4 sentences for a VP",
+  "stories": [
+    {
+      "title": "Story title",
+      "category": "competitive_intelligence | talent_market | infrastructure | product_development | regulation | research",
+      "key_facts": ["fact1", "fact2"],
+      "companies": ["company1", "company2"],
+      "google_implications": "What this means for Google",
+      "confidence": "high | medium | low",
+      "reasoning": "Brief explanation of how you arrived at this analysis",
+      "links_to_follow": ["link descriptions worth fetching"]
+    }
+  ],
+  "trend_signals": [
+    {
+      "trend": "Trend name",
+      "evidence": "Evidence from newsletter",
+      "trajectory": "accelerating | stable | uncertain"
+    }
+  ],
+  "action_items": ["Specific recommendations"],
+  "analysis_notes": "Any caveats or limitations in this analysis"
+}
+
+Respond with ONLY valid JSON."""
 
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: str = DEFAULT_MODEL,
         progress_callback: Optional[Callable] = None,
-        verbose: bool = False
+        verbose: bool = False,
+        mode: str = "two_pass",
+        cache_dir: Optional[str | Path] = None,
+        requests_per_minute: Optional[int] = None
     ):
         """
         Initialize the agentic extractor.
@@ -42,15 +489,57 @@ class AgenticExtractor(BaseExtractor):
             model: Claude model to use
             progress_callback: Optional callback for progress updates
             verbose: If True, print detailed analysis to stdout
+            mode: "two_pass" (analyze, then structure), "single_pass" (one tool-use
+                call), or "speculative" (race both; costs extra tokens for lower latency)
+            cache_dir: Optional directory for caching results by EML content hash
+            requests_per_minute: Optional cap on Messages API requests (e.g. the
+                account's RPM limit) shared by concurrent extractions
         """
         super().__init__(api_key, progress_callback)
         self.api_key = api_key or os.getenv("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not found in environment or arguments")
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown extraction mode: {mode} (expected one of {self.MODES})")
 
         self.model = model
         self.verbose = verbose
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.mode = mode
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._rate_limiter = RateLimiter(requests_per_minute) if requests_per_minute else None
+        self.client = _shared_client(self.api_key)
+
+    @property
+    def aclient(self) -> anthropic.AsyncAnthropic:
+        """Async Anthropic client of the enclosing _async_client_scope."""
+        scope = _async_client.get()
+        if scope is None or scope[0] is not self:
+            raise RuntimeError("Async client used outside _async_client_scope()")
+        return scope[1]
+
+    @contextlib.asynccontextmanager
+    async def _async_client_scope(self):
+        """
+        Provide an AsyncAnthropic client for the duration of a block.
+
+        Async connections are bound to the event loop that opened them, so
+        each scope opens its own client and closes it on exit. The client is
+        held in a context variable, so tasks started inside the block share
+        it while other threads' event loops never see it. Nested scopes reuse
+        the outer client.
+        """
+        scope = _async_client.get()
+        if scope is not None and scope[0] is self:
+            yield
+            return
+
+        http_client = anthropic.DefaultAsyncHttpxClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS)
+        async with anthropic.AsyncAnthropic(api_key=self.api_key, http_client=http_client) as client:
+            token = _async_client.set((self, client))
+            try:
+                yield
+            finally:
+                _async_client.reset(token)
 
     def extract(self, eml_path: str | Path) -> dict:
         """
@@ -67,49 +556,484 @@ class AgenticExtractor(BaseExtractor):
             ValueError: If file is invalid
             anthropic.APIError: For API errors
         """
+        if self.mode == "speculative":
+            # Racing both strategies needs concurrency; run the async path
+            return asyncio.run(self.aextract(eml_path))
+
         path = self._validate_eml_file(eml_path)
 
         self._log_progress(f"Reading {path.name}...")
         eml_content = self._read_eml(path)
 
+        cache_key = self._cache_key(eml_content)
+        cached = self._cache_get(cache_key, path)
+        if cached is not None:
+            return cached
+
+        if self.mode == "single_pass":
+            self._log_progress("Running single-pass extraction...")
+            result, usage = self._extract_single_pass(eml_content)
+            result = self._finalize(result, "", path, usage)
+        else:
+            self._log_progress("Running pass 1: Analysis...")
+            analysis_text, pass1_usage = self._analyze(eml_content)
+
+            self._log_progress("Running pass 2: Structuring...")
+            result, pass2_usage = self._structure(eml_content, analysis_text)
+            result = self._finalize(result, analysis_text, path, pass1_usage, pass2_usage)
+
+        self._cache_put(cache_key, result)
+        return result
+
+    async def aextract(self, eml_path: str | Path) -> dict:
+        """
+        Async variant of extract using AsyncAnthropic.
+
+        Args:
+            eml_path: Path to .eml file
+
+        Returns:
+            Structured extraction result as dict
+        """
+        async with self._async_client_scope():
+            return await self._aextract(eml_path)
+
+    async def _aextract(self, eml_path: str | Path) -> dict:
+        """Body of aextract, run inside an async client scope."""
+        path = self._validate_eml_file(eml_path)
+
+        self._log_progress(f"Reading {path.name}...")
+        eml_content = self._read_eml(path)
+
+        cache_key = self._cache_key(eml_content)
+        cached = self._cache_get(cache_key, path)
+        if cached is not None:
+            return cached
+
+        if self.mode == "single_pass":
+            self._log_progress("Running single-pass extraction...")
+            result = await self._arun_single_pass(eml_content, path)
+        elif self.mode == "two_pass":
+            result = await self._arun_two_pass(eml_content, path)
+        else:
+            self._log_progress("Running single-pass and two-pass extraction concurrently...")
+            result = await self._arun_speculative(eml_content, path)
+
+        self._cache_put(cache_key, result)
+        return result
+
+    async def _arun_single_pass(self, eml_content: str, path: Path) -> dict:
+        """Run single-pass extraction and finalize the result."""
+        result, usage = await self._aextract_single_pass(eml_content)
+        return self._finalize(result, "", path, usage)
+
+    async def _arun_two_pass(self, eml_content: str, path: Path) -> dict:
+        """Run both passes and finalize the result."""
         self._log_progress("Running pass 1: Analysis...")
-        analysis_text, pass1_usage = self._analyze(eml_content)
+        analysis_text, pass1_usage = await self._aanalyze(eml_content)
 
         self._log_progress("Running pass 2: Structuring...")
-        result, pass2_usage = self._structure(eml_content, analysis_text)
+        result, pass2_usage = await self._astructure(eml_content, analysis_text)
+        return self._finalize(result, analysis_text, path, pass1_usage, pass2_usage)
+
+    async def _arun_speculative(self, eml_content: str, path: Path) -> dict:
+        """
+        Race single-pass against two-pass extraction.
+
+        The first result that parsed is returned and the other request is
+        cancelled, so latency is roughly that of the faster strategy. Tokens
+        spent on the cancelled request are not counted in _metadata.
+        """
+        pending = {
+            asyncio.create_task(self._arun_single_pass(eml_content, path)),
+            asyncio.create_task(self._arun_two_pass(eml_content, path)),
+        }
+        fallback = None
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                    elif task.result().get('parse_error'):
+                        fallback = task.result()
+                    else:
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        # Neither strategy produced valid JSON
+        if fallback is not None:
+            return fallback
+        raise error
+
+    def extract_batch(
+        self,
+        eml_paths: List[str | Path],
+        concurrency: int = 8
+    ) -> List[dict | Exception]:
+        """
+        Extract many newsletters concurrently.
+
+        Args:
+            eml_paths: Paths to .eml files
+            concurrency: Max extractions in flight at once
+
+        Returns:
+            Results in input order; a failed extraction is returned as its exception
+        """
+        async def run() -> List[dict | Exception]:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def extract_one(eml_path: str | Path) -> dict:
+                async with semaphore:
+                    return await self.aextract(eml_path)
+
+            # One client for the whole batch, closed when it finishes
+            async with self._async_client_scope():
+                return await asyncio.gather(
+                    *(extract_one(eml_path) for eml_path in eml_paths),
+                    return_exceptions=True
+                )
+
+        return asyncio.run(run())
+
+    def extract_batch_offline(self, eml_paths: List[str | Path]) -> List[dict | Exception]:
+        """
+        Extract many newsletters through the Message Batches API.
+
+        Batches are billed at a discount and don't count against per-minute
+        rate limits, but can take up to 24 hours, so this suits backlog
+        processing rather than interactive runs. In two-pass mode, pass 1 and
+        pass 2 are each submitted as one batch; speculative mode has nothing
+        to race here and runs as two-pass.
+
+        Args:
+            eml_paths: Paths to .eml files
+
+        Returns:
+            Results in input order; a failed extraction is returned as its exception
+        """
+        results: List[dict | Exception] = [None] * len(eml_paths)
+        paths = {}
+        contents = {}
+        cache_keys = {}
+        for i, eml_path in enumerate(eml_paths):
+            try:
+                paths[i] = self._validate_eml_file(eml_path)
+                eml_content = self._read_eml(paths[i])
+            except (FileNotFoundError, ValueError) as e:
+                results[i] = e
+                continue
+
+            cache_keys[i] = self._cache_key(eml_content)
+            cached = self._cache_get(cache_keys[i], paths[i])
+            if cached is not None:
+                results[i] = cached
+            else:
+                contents[i] = eml_content
+
+        if self.mode == "single_pass":
+            self._log_progress(f"Submitting batch of {len(contents)} single-pass extractions...")
+            responses = self._run_batch({i: self._single_pass_request(c) for i, c in contents.items()})
+            for i, response in responses.items():
+                if isinstance(response, Exception):
+                    results[i] = response
+                    continue
+                try:
+                    result = self._finalize(self._parse_tool_use(response), "", paths[i], response.usage)
+                except Exception as e:  # A malformed response fails only its own newsletter
+                    results[i] = e
+                    continue
+                results[i] = result
+                self._cache_put(cache_keys[i], result)
+            return results
+
+        self._log_progress(f"Submitting pass 1 batch ({len(contents)} newsletters)...")
+        pass1 = self._run_batch({i: self._analysis_request(c) for i, c in contents.items()})
+
+        analyses = {}
+        for i, response in pass1.items():
+            if isinstance(response, Exception):
+                results[i] = response
+                continue
+            try:
+                analyses[i] = (response.content[0].text, response.usage)
+            except Exception as e:  # Empty or non-text content
+                results[i] = e
+
+        self._log_progress(f"Submitting pass 2 batch ({len(analyses)} newsletters)...")
+        pass2 = self._run_batch({
+            i: self._structure_request(contents[i], analysis_text)
+            for i, (analysis_text, _) in analyses.items()
+        })
+
+        for i, response in pass2.items():
+            if isinstance(response, Exception):
+                results[i] = response
+                continue
+
+            analysis_text, pass1_usage = analyses[i]
+            try:
+                result = self._parse_structured(response.content[0].text, analysis_text)
+                result = self._finalize(result, analysis_text, paths[i], pass1_usage, response.usage)
+            except Exception as e:  # A malformed response fails only its own newsletter
+                results[i] = e
+                continue
+            results[i] = result
+            self._cache_put(cache_keys[i], result)
+
+        return results
+
+    def submit_batch(self, requests: dict) -> str:
+        """
+        Submit Messages API requests as a Message Batch.
+
+        Args:
+            requests: Mapping of custom ID to Messages API arguments
+
+        Returns:
+            Batch ID
+        """
+        batch = self.client.messages.batches.create(requests=[
+            {"custom_id": str(custom_id), "params": params}
+            for custom_id, params in requests.items()
+        ])
+        logger.info(f"Submitted message batch {batch.id} ({len(requests)} requests)")
+        return batch.id
+
+    def submit_extractions(self, eml_paths: dict) -> tuple[Optional[str], dict]:
+        """
+        Submit single-pass extractions as a Message Batch without waiting.
+
+        Use collect_extractions (e.g. from a later run) to fetch the results.
+        Batches always use single-pass requests, so no second round trip is
+        needed once the batch ends. Emails with a cached extraction are not
+        submitted; their results are returned right away.
+
+        Args:
+            eml_paths: Mapping of custom ID (e.g. Gmail message ID) to .eml path
+
+        Returns:
+            (batch ID, or None if every email was cached;
+             mapping of custom ID to cached result)
+        """
+        requests = {}
+        cached = {}
+        for custom_id, eml_path in eml_paths.items():
+            path = self._validate_eml_file(eml_path)
+            eml_content = self._read_eml(path)
+            result = self._cache_get(self._cache_key(eml_content, "single_pass"), path)
+            if result is not None:
+                cached[custom_id] = result
+            else:
+                requests[custom_id] = self._single_pass_request(eml_content)
+
+        batch_id = self.submit_batch(requests) if requests else None
+        return batch_id, cached
+
+    def collect_extractions(self, batch_id: str, eml_paths: dict) -> Optional[dict]:
+        """
+        Collect the results of a batch submitted with submit_extractions.
+
+        Args:
+            batch_id: Batch ID returned by submit_extractions
+            eml_paths: Mapping of custom ID to .eml path, as submitted
+
+        Returns:
+            None if the batch is still processing, otherwise a mapping of
+            custom ID to result (or to an exception if that request failed)
+        """
+        batch = self.client.messages.batches.retrieve(batch_id)
+        if batch.processing_status != "ended":
+            return None
+
+        results = {}
+        for custom_id, response in self._batch_results(batch_id, eml_paths.keys()).items():
+            if isinstance(response, Exception):
+                results[custom_id] = response
+                continue
+
+            path = Path(eml_paths[custom_id])
+            try:
+                result = self._finalize(self._parse_tool_use(response), "", path, response.usage)
+                result['_metadata']['mode'] = "single_pass"
+                self._cache_put(self._cache_key(self._read_eml(path), "single_pass"), result)
+            except Exception as e:  # A malformed response fails only its own newsletter
+                results[custom_id] = e
+                continue
+            results[custom_id] = result
+
+        return results
+
+    def _run_batch(self, requests: dict) -> dict:
+        """
+        Submit a batch, wait for it to end, and collect the responses.
+
+        Args:
+            requests: Mapping of integer index to Messages API arguments
+
+        Returns:
+            Mapping of index to Message, or to an exception if that request failed
+        """
+        if not requests:
+            return {}
+
+        batch_id = self.submit_batch(requests)
+        batch = self.client.messages.batches.retrieve(batch_id)
+        while batch.processing_status != "ended":
+            time.sleep(self.BATCH_POLL_SECONDS)
+            batch = self.client.messages.batches.retrieve(batch_id)
+
+        responses = self._batch_results(batch_id, (str(i) for i in requests))
+        return {int(custom_id): response for custom_id, response in responses.items()}
+
+    def _batch_results(self, batch_id: str, custom_ids) -> dict:
+        """
+        Read the results of an ended batch.
+
+        Returns:
+            Mapping of custom ID to Message, or to an exception if that request failed
+        """
+        responses = {}
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                responses[entry.custom_id] = entry.result.message
+            else:
+                responses[entry.custom_id] = RuntimeError(
+                    f"Batch request {entry.result.type}: {entry.result}"
+                )
+
+        for custom_id in set(custom_ids) - responses.keys():
+            responses[custom_id] = RuntimeError("Batch request returned no result")
+
+        return responses
+
+    def _throttle(self) -> None:
+        """Wait for the rate limiter, if any, before a Messages API request."""
+        if self._rate_limiter:
+            self._rate_limiter.acquire()
+
+    async def _athrottle(self) -> None:
+        """Async variant of _throttle."""
+        if self._rate_limiter:
+            await self._rate_limiter.aacquire()
+
+    def _cache_key(self, eml_content: str, mode: Optional[str] = None) -> str:
+        """
+        Hash the EML content together with everything that affects the result.
+
+        mode overrides self.mode for paths that always run one strategy
+        (Message Batches submitted by submit_extractions are single-pass).
+        """
+        digest = hashlib.blake2b(eml_content.encode('utf-8'), digest_size=20)
+        digest.update(f"|{self.model}|{mode or self.mode}|{self.PROMPT_VERSION}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def _cache_get(self, cache_key: str, path: Path) -> Optional[dict]:
+        """Return a cached result for this content, or None on a miss."""
+        if not self.cache_dir:
+            return None
+
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        if not cache_file.exists():
+            return None
+
+        result = _json_loads(cache_file.read_bytes())
+        metadata = result.setdefault('_metadata', {})
+
+        # No API call was made, so this extraction cost nothing
+        for key in self._TOKEN_METADATA_KEYS:
+            metadata[key] = 0
+        metadata['source_file'] = str(path)
+        metadata['cache_hit'] = True
+        self._log_progress(f"✓ Using cached extraction for {path.name}")
+        return result
+
+    def _cache_put(self, cache_key: str, result: dict) -> None:
+        """Atomically store a result in the cache (failed parses are not cached)."""
+        if not self.cache_dir or result.get('parse_error'):
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        cache_file = self.cache_dir / f"{cache_key}.json"
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_file.write_bytes(_json_dumps(result))
+        os.replace(tmp_file, cache_file)
+
+    def _finalize(
+        self,
+        result: dict,
+        analysis_text: str,
+        path: Path,
+        pass1_usage: anthropic.types.Usage,
+        pass2_usage: Optional[anthropic.types.Usage] = None
+    ) -> dict:
+        """
+        Attach metadata and raw reasoning to a structured result.
+
+        In single-pass mode there is no pass 2, so its token counts are zero.
+        """
+        # Read each usage field once
+        pass1_input = pass1_usage.input_tokens
+        pass1_output = pass1_usage.output_tokens
+        if pass2_usage:
+            pass2_input = pass2_usage.input_tokens
+            pass2_output = pass2_usage.output_tokens
+        else:
+            pass2_input = pass2_output = 0
+        total_tokens = pass1_input + pass1_output + pass2_input + pass2_output
 
         # Add metadata
         result['_metadata'] = {
             'extractor': 'agentic',
+            'mode': self.mode,
             'model': self.model,
-            'pass1_input_tokens': pass1_usage.input_tokens,
-            'pass1_output_tokens': pass1_usage.output_tokens,
-            'pass2_input_tokens': pass2_usage.input_tokens,
-            'pass2_output_tokens': pass2_usage.output_tokens,
-            'total_tokens': (
-                pass1_usage.input_tokens + pass1_usage.output_tokens +
-                pass2_usage.input_tokens + pass2_usage.output_tokens
-            ),
+            'pass1_input_tokens': pass1_input,
+            'pass1_output_tokens': pass1_output,
+            'pass2_input_tokens': pass2_input,
+            'pass2_output_tokens': pass2_output,
+            'total_tokens': total_tokens,
             'source_file': str(path)
         }
 
         # Store raw reasoning for debugging
         result['_raw_reasoning'] = analysis_text
 
-        self._log_progress(f"✓ Extraction complete ({result['_metadata']['total_tokens']} tokens)")
+        self._log_progress(f"✓ Extraction complete ({total_tokens} tokens)")
 
         return result
 
     def _read_eml(self, path: Path) -> str:
-        """Read and truncate EML file content."""
-        with open(path, 'r', errors='replace') as f:
-            content = f.read()
+        """Read, clean and truncate EML file content (cached until the file changes)."""
+        return _read_eml_cached(str(path), path.stat().st_mtime_ns, self.MAX_EML_CHARS)
+
+    @classmethod
+    def _eml_block(cls, eml_content: str) -> dict:
+        """Build the content block carrying the full EML."""
+        return {
+            "type": "text",
+            "text": "".join((cls.EML_PREFIX, eml_content, cls.EML_SUFFIX))
+        }
 
-        if len(content) > self.MAX_EML_CHARS:
-            logger.warning(f"Truncating email from {len(content)} to {self.MAX_EML_CHARS} chars")
-            content = content[:self.MAX_EML_CHARS]
+    @classmethod
+    def _eml_excerpt_block(cls, eml_content: str) -> dict:
+        """
+        Build a short stand-in for the EML used in pass 2.
 
-        return content
+        Pass 2 only restructures the pass 1 analysis, so the headers and the
+        start of the email are enough context; resending the whole EML would
+        roughly double input tokens.
+        """
+        return {
+            "type": "text",
+            "text": "".join((
+                cls.EML_EXCERPT_PREFIX, eml_content[:cls.EML_EXCERPT_CHARS], cls.EML_SUFFIX
+            ))
+        }
 
     def _analyze(self, eml_content: str) -> tuple[str, anthropic.types.Usage]:
         """
@@ -118,67 +1042,60 @@ class AgenticExtractor(BaseExtractor):
         Returns:
             (analysis_text, usage_stats)
         """
-        system_prompt = """You are an AI research analyst with access to tools.
-Your task is to analyze a newsletter email for a VP at Google.
-
-You should:
-1. First, understand the structure of the email (it's in EML format)
-2. Identify the main stories/sections
-3. For each story, extract key facts, companies mentioned, and implications
-4. Identify which links would be worth following for deeper context
-5. Synthesize into actionable insights
-
-Think step by step. Explain your reasoning as you analyze.
-
-The VP cares about:
-- Competitive moves by Meta, OpenAI, Microsoft, AWS
-- Talent market dynamics
-- Infrastructure investments
-- Technical trends
-- Strategic opportunities/threats for Google
-
-Be specific and actionable. Distinguish between confirmed facts and speculation."""
-
-        user_prompt = f"""Please analyze this newsletter email. It's from "The Batch" by DeepLearning.AI.
+        # Stream so verbose output appears as it is generated
+        self._throttle()
+        self._print_analysis_header()
+        with self.client.messages.stream(**self._analysis_request(eml_content)) as stream:
+            for text in stream.text_stream:
+                self._print_analysis_chunk(text)
+            response = stream.get_final_message()
+        self._print_analysis_footer()
 
-Here is the raw EML file content:
+        return response.content[0].text, response.usage
 
-```
-{eml_content}
-```
-
-Please:
-1. Parse the email structure (identify HTML content, plain text, metadata)
-2. Extract the main stories covered
-3. For each story, identify:
-   - Key facts and numbers
-   - Companies mentioned
-   - What this means for Google specifically
-   - Which links would be worth following for more detail
-4. Identify any trend signals across the stories
-5. Provide a final executive summary
+    async def _aanalyze(self, eml_content: str) -> tuple[str, anthropic.types.Usage]:
+        """Async variant of _analyze."""
+        await self._athrottle()
+        self._print_analysis_header()
+        async with self.aclient.messages.stream(**self._analysis_request(eml_content)) as stream:
+            async for text in stream.text_stream:
+                self._print_analysis_chunk(text)
+            response = await stream.get_final_message()
+        self._print_analysis_footer()
 
-Think through this step by step, showing your reasoning."""
+        return response.content[0].text, response.usage
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=8192,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_prompt}]
-        )
-
-        analysis_text = response.content[0].text
+    def _analysis_request(self, eml_content: str) -> dict:
+        """Build the Messages API arguments for pass 1."""
+        return {
+            "model": self.model,
+            "max_tokens": 8192,
+            "system": self.SYSTEM_PROMPT,
+            "messages": [{
+                "role": "user",
+                "content": [
+                    self._eml_block(eml_content),
+                    {"type": "text", "text": self.ANALYSIS_INSTRUCTIONS}
+                ]
+            }]
+        }
 
+    def _print_analysis_header(self) -> None:
+        """Print the pass 1 banner when verbose."""
         if self.verbose:
             print("\n" + "=" * 60)
             print("CLAUDE'S ANALYSIS (Pass 1):")
             print("-" * 60)
-            print(analysis_text[:3000])
-            if len(analysis_text) > 3000:
-                print("...")
-            print("=" * 60)
 
-        return analysis_text, response.usage
+    def _print_analysis_chunk(self, text: str) -> None:
+        """Print streamed pass 1 text when verbose."""
+        if self.verbose:
+            print(text, end="", flush=True)
+
+    def _print_analysis_footer(self) -> None:
+        """Close the pass 1 banner when verbose."""
+        if self.verbose:
+            print("\n" + "=" * 60)
 
     def _structure(
         self,
@@ -191,86 +1108,133 @@ Think through this step by step, showing your reasoning."""
         Returns:
             (structured_result_dict, usage_stats)
         """
-        structuring_prompt = f"""Based on your analysis above, now provide a structured JSON output.
+        request = self._structure_request(eml_content, analysis_text)
+        self._throttle()
+        response = self.client.messages.create(**request)
 
-Your analysis:
-{analysis_text}
-
-Please provide the final output as JSON with this structure:
+        return self._parse_structured(response.content[0].text, analysis_text), response.usage
 
-{{
-  "executive_summary": "3-4 sentences for a VP",
-  "stories": [
-    {{
-      "title": "Story title",
-      "category": "competitive_intelligence | talent_market | infrastructure | product_development | regulation | research",
-      "key_facts": ["fact1", "fact2"],
-      "companies": ["company1", "company2"],
-      "google_implications": "What this means for Google",
-      "confidence": "high | medium | low",
-      "reasoning": "Brief explanation of how you arrived at this analysis",
-      "links_to_follow": ["link descriptions worth fetching"]
-    }}
-  ],
-  "trend_signals": [
-    {{
-      "trend": "Trend name",
-      "evidence": "Evidence from newsletter",
-      "trajectory": "accelerating | stable | uncertain"
-    }}
-  ],
-  "action_items": ["Specific recommendations"],
-  "analysis_notes": "Any caveats or limitations in this analysis"
-}}
+    async def _astructure(
+        self,
+        eml_content: str,
+        analysis_text: str
+    ) -> tuple[dict, anthropic.types.Usage]:
+        """Async variant of _structure."""
+        request = self._structure_request(eml_content, analysis_text)
+        await self._athrottle()
+        response = await self.aclient.messages.create(**request)
 
-Respond with ONLY valid JSON."""
+        return self._parse_structured(response.content[0].text, analysis_text), response.usage
 
+    def _structure_request(self, eml_content: str, analysis_text: str) -> dict:
+        """Build the Messages API arguments for pass 2."""
         # Build message history (include pass 1 context)
-        user_prompt = f"""Please analyze this newsletter email. It's from "The Batch" by DeepLearning.AI.
+        return {
+            "model": self.model,
+            "max_tokens": 4096,
+            "system": self.SYSTEM_PROMPT,
+            "messages": [
+                {"role": "user", "content": [self._eml_excerpt_block(eml_content)]},
+                {"role": "assistant", "content": analysis_text},
+                {"role": "user", "content": self._structuring_prompt(analysis_text)}
+            ]
+        }
 
-Here is the raw EML file content:
+    def _extract_single_pass(self, eml_content: str) -> tuple[dict, anthropic.types.Usage]:
+        """
+        Analyze and structure in one call, reading the JSON from a forced tool use.
 
-```
-{eml_content}
-```"""
+        Returns:
+            (structured_result_dict, usage_stats)
+        """
+        self._throttle()
+        response = self.client.messages.create(**self._single_pass_request(eml_content))
+        return self._parse_tool_use(response), response.usage
 
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=4096,
-            messages=[
-                {"role": "user", "content": user_prompt},
-                {"role": "assistant", "content": analysis_text},
-                {"role": "user", "content": structuring_prompt}
-            ]
-        )
+    async def _aextract_single_pass(self, eml_content: str) -> tuple[dict, anthropic.types.Usage]:
+        """Async variant of _extract_single_pass."""
+        await self._athrottle()
+        response = await self.aclient.messages.create(**self._single_pass_request(eml_content))
+        return self._parse_tool_use(response), response.usage
+
+    def _single_pass_request(self, eml_content: str) -> dict:
+        """Build the Messages API arguments for single-pass extraction."""
+        return {
+            "model": self.model,
+            "max_tokens": 8192,
+            "system": self.SYSTEM_PROMPT,
+            "tools": [EXTRACTION_TOOL],
+            "tool_choice": {"type": "tool", "name": EXTRACTION_TOOL["name"]},
+            "messages": [{
+                "role": "user",
+                "content": [
+                    self._eml_block(eml_content),
+                    {
+                        "type": "text",
+                        "text": "Analyze this newsletter and report your findings with the "
+                                f"{EXTRACTION_TOOL['name']} tool."
+                    }
+                ]
+            }]
+        }
+
+    def _parse_tool_use(self, response) -> dict:
+        """Read the structured result from the tool_use block of a response."""
+        for block in response.content:
+            if block.type == "tool_use" and block.name == EXTRACTION_TOOL["name"]:
+                result = _coerce_extraction(dict(block.input))
+                if result is not None:
+                    return result
+                logger.error("Single-pass tool input doesn't match the extraction schema")
+                break
+        else:
+            logger.error("No tool_use block in single-pass response")
+
+        text = "".join(block.text for block in response.content if block.type == "text")
+        return self._parse_structured(text, "")
 
-        structured_text = response.content[0].text
+    @classmethod
+    def _structuring_prompt(cls, analysis_text: str) -> str:
+        """Build the pass 2 prompt asking for JSON output."""
+        return cls.STRUCTURING_PREFIX + analysis_text + cls.STRUCTURING_SUFFIX
 
-        # Parse JSON
+    @staticmethod
+    def _parse_structured(structured_text: str, analysis_text: str) -> dict:
+        """Parse and validate pass 2 output, falling back to an error result."""
+        # Parse JSON (JSONDecodeError also covers orjson's decode errors)
         try:
-            result = json.loads(structured_text)
-        except json.JSONDecodeError:
-            # Try to extract JSON from markdown code blocks or text
-            logger.warning("Failed to parse JSON directly, trying regex extraction")
-            json_match = re.search(r'\{.*\}', structured_text, re.DOTALL)
-            if json_match:
-                try:
-                    result = json.loads(json_match.group())
-                except json.JSONDecodeError:
-                    logger.error("Failed to parse extracted JSON")
-                    result = {
-                        "raw_analysis": analysis_text,
-                        "raw_structured": structured_text,
-                        "parse_error": True,
-                        "error": "JSON parsing failed"
-                    }
-            else:
-                logger.error("No JSON found in response")
-                result = {
-                    "raw_analysis": analysis_text,
-                    "raw_structured": structured_text,
-                    "parse_error": True,
-                    "error": "No JSON found"
-                }
-
-        return result, response.usage
+            result = _coerce_extraction(_json_loads(structured_text))
+        except JSONDecodeError:
+            result = None
+        if result is not None:
+            return result
+
+        # Try to extract JSON from a markdown code block, then from surrounding text
+        logger.warning("Failed to parse JSON directly, trying to extract it from the response")
+        candidates = [
+            candidate
+            for candidate in (_strip_json_fence(structured_text), _find_json_object(structured_text))
+            if candidate is not None
+        ]
+
+        for candidate in candidates:
+            try:
+                result = _coerce_extraction(_json_loads(candidate))
+            except JSONDecodeError:
+                continue
+            if result is not None:
+                return result
+
+        if candidates:
+            logger.error("Failed to parse extracted JSON")
+            error = "JSON parsing failed"
+        else:
+            logger.error("No JSON found in response")
+            error = "No JSON found"
+
+        return {
+            "raw_analysis": analysis_text,
+            "raw_structured": structured_text,
+            "parse_error": True,
+            "error": error
+        }
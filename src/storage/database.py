@@ -1,10 +1,13 @@
 """SQLite database for tracking newsletter processing state."""
 
 import logging
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager, suppress
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, List
+from typing import Callable, Iterator, Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +15,41 @@ logger = logging.getLogger(__name__)
 class Database:
     """Track newsletter processing state in SQLite."""
 
+    # Hot-path statements, defined once so every call reuses the same SQL
+    # text (and so the same prepared statement from the connection cache)
+    _SQL_IS_PROCESSED = "SELECT 1 FROM newsletters WHERE message_id = ?"
+    _SQL_INSERT_NEWSLETTER = (
+        "INSERT INTO newsletters (message_id, sender_email, subject, received_date) "
+        "VALUES (?, ?, ?, ?)"
+    )
+    _SQL_MARK_DOWNLOADED = (
+        "UPDATE newsletters SET downloaded_at = ?, eml_path = ?, updated_at = ? "
+        "WHERE message_id = ?"
+    )
+    _SQL_MARK_EXTRACTED = (
+        "UPDATE newsletters SET processed_at = ?, extraction_path = ?, tokens_used = ?, "
+        "updated_at = ? WHERE message_id = ?"
+    )
+    _SQL_MARK_SUBMITTED = (
+        "UPDATE newsletters SET status = 'submitted', batch_id = ?, updated_at = ? "
+        "WHERE message_id = ?"
+    )
+    _SQL_MARK_UPLOADED = (
+        "UPDATE newsletters SET notion_page_id = ?, status = 'completed', updated_at = ? "
+        "WHERE message_id = ?"
+    )
+    _SQL_MARK_FAILED = (
+        "UPDATE newsletters SET status = 'failed', error_message = ?, updated_at = ? "
+        "WHERE message_id = ?"
+    )
+    _SQL_LOG_EVENT = (
+        "INSERT INTO processing_log (newsletter_id, event, details) VALUES (?, ?, ?)"
+    )
+    _SQL_LOG_EVENT_BY_MESSAGE_ID = (
+        "INSERT INTO processing_log (newsletter_id, event, details) "
+        "SELECT id, ?, ? FROM newsletters WHERE message_id = ?"
+    )
+
     def __init__(self, db_path: str = "data/newsletter.db"):
         """
         Initialize database connection.
@@ -22,10 +60,26 @@ class Database:
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn = sqlite3.connect(str(self.db_path), cached_statements=256)
         self.conn.row_factory = sqlite3.Row  # Access columns by name
 
+        # WAL lets readers run alongside the writer and needs one fsync per
+        # commit (at checkpoint) instead of two; NORMAL is durable under WAL
+        # except for the last commits on power loss
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA temp_store=MEMORY")
+        self.conn.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        self.conn.execute("PRAGMA cache_size=-65536")  # 64 MB
+        self._batch_depth = 0  # Commits are deferred while > 0 (see batch())
+        self._writer: Optional[threading.Thread] = None  # Started by enqueue()
+        self._writer_queue: queue.Queue = queue.Queue()
+        self._writer_error: Optional[Exception] = None
+
         self._create_tables()
+
+        # Message IDs known to be tracked; is_processed answers hits from memory
+        self._seen = {row[0] for row in self.conn.execute("SELECT message_id FROM newsletters")}
         logger.info(f"Database initialized: {self.db_path}")
 
     def _create_tables(self):
@@ -48,11 +102,17 @@ class Database:
                 status TEXT NOT NULL DEFAULT 'pending',
                 error_message TEXT,
                 tokens_used INTEGER,
+                batch_id TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
 
+        # Columns added after the initial schema
+        columns = {row['name'] for row in cursor.execute("PRAGMA table_info(newsletters)")}
+        if 'batch_id' not in columns:
+            cursor.execute("ALTER TABLE newsletters ADD COLUMN batch_id TEXT")
+
         # Processing log table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS processing_log (
@@ -81,8 +141,39 @@ class Database:
             ON newsletters(status)
         """)
 
+        # Covers get_last_processed_date (MAX over one sender's completed rows)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_sender_status_received
+            ON newsletters(sender_email, status, received_date DESC)
+        """)
+
         self.conn.commit()
 
+    @contextmanager
+    def batch(self):
+        """
+        Group updates into a single transaction.
+
+        Commits inside the block are deferred to one commit on exit (including
+        on error, so completed state transitions aren't lost). Blocks may nest.
+        Updates queued with enqueue() are written first, so every state
+        transition lands in the order it was requested.
+        """
+        if not self._batch_depth:
+            self.flush()
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.conn.commit()
+
+    def _commit(self):
+        """Commit now, unless inside batch()."""
+        if not self._batch_depth:
+            self.conn.commit()
+
     def is_processed(self, message_id: str) -> bool:
         """
         Check if a message has already been processed.
@@ -93,12 +184,15 @@ class Database:
         Returns:
             True if message exists in database
         """
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT 1 FROM newsletters WHERE message_id = ?",
-            (message_id,)
-        )
-        return cursor.fetchone() is not None
+        if message_id in self._seen:
+            return True
+
+        # Not seen by this connection; another process may have added it
+        if self.conn.execute(self._SQL_IS_PROCESSED, (message_id,)).fetchone() is None:
+            return False
+
+        self._seen.add(message_id)
+        return True
 
     def add_newsletter(
         self,
@@ -119,67 +213,97 @@ class Database:
         Returns:
             Newsletter ID (database primary key)
         """
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO newsletters (message_id, sender_email, subject, received_date)
-            VALUES (?, ?, ?, ?)
-        """, (message_id, sender_email, subject, received_date))
+        with self.batch():
+            cursor = self.conn.execute(
+                self._SQL_INSERT_NEWSLETTER,
+                (message_id, sender_email, subject, received_date)
+            )
+            newsletter_id = cursor.lastrowid
 
-        self.conn.commit()
-        newsletter_id = cursor.lastrowid
+            self._log_event(newsletter_id, "added", f"Newsletter added: {subject}")
 
-        self._log_event(newsletter_id, "added", f"Newsletter added: {subject}")
+        self._seen.add(message_id)
         logger.info(f"Added newsletter {message_id} to database")
 
         return newsletter_id
 
     def mark_downloaded(self, message_id: str, eml_path: str):
         """Mark newsletter as downloaded."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE newsletters
-            SET downloaded_at = ?, eml_path = ?, updated_at = ?
-            WHERE message_id = ?
-        """, (datetime.now(), eml_path, datetime.now(), message_id))
+        self.mark_many_downloaded([(message_id, eml_path)])
 
-        self.conn.commit()
-        self._log_event_by_message_id(message_id, "downloaded", eml_path)
+    def mark_many_downloaded(self, items: List[Tuple[str, str]]):
+        """
+        Mark several newsletters as downloaded in one transaction.
+
+        Args:
+            items: (message_id, eml_path) pairs
+        """
+        now = datetime.now()
+        with self.batch():
+            self.conn.executemany(
+                self._SQL_MARK_DOWNLOADED,
+                [(now, eml_path, now, message_id) for message_id, eml_path in items]
+            )
+
+            self._log_events_by_message_id("downloaded", items)
 
     def mark_extracted(self, message_id: str, extraction_path: str, tokens_used: int = None):
         """Mark newsletter as extracted."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE newsletters
-            SET processed_at = ?, extraction_path = ?, tokens_used = ?, updated_at = ?
-            WHERE message_id = ?
-        """, (datetime.now(), extraction_path, tokens_used, datetime.now(), message_id))
+        self.mark_many_extracted([(message_id, extraction_path, tokens_used)])
 
-        self.conn.commit()
-        self._log_event_by_message_id(message_id, "extracted", f"Tokens: {tokens_used}")
+    def mark_many_extracted(self, items: List[Tuple[str, str, Optional[int]]]):
+        """
+        Mark several newsletters as extracted in one transaction.
+
+        Args:
+            items: (message_id, extraction_path, tokens_used) tuples
+        """
+        with self.batch():
+            self._write_extracted(self.conn, items)
+
+    @classmethod
+    def _write_extracted(cls, conn: sqlite3.Connection, items: List[Tuple[str, str, Optional[int]]]):
+        """Apply mark_many_extracted's statements on conn (without committing)."""
+        now = datetime.now()
+        conn.executemany(cls._SQL_MARK_EXTRACTED, [
+            (now, extraction_path, tokens_used, now, message_id)
+            for message_id, extraction_path, tokens_used in items
+        ])
+        conn.executemany(cls._SQL_LOG_EVENT_BY_MESSAGE_ID, [
+            ("extracted", f"Tokens: {tokens_used}", message_id)
+            for message_id, _, tokens_used in items
+        ])
+
+    def mark_submitted(self, message_ids: List[str], batch_id: str):
+        """Mark newsletters as submitted for extraction in a Message Batch."""
+        now = datetime.now()
+        with self.batch():
+            self.conn.executemany(
+                self._SQL_MARK_SUBMITTED,
+                [(batch_id, now, message_id) for message_id in message_ids]
+            )
+
+            self._log_events_by_message_id(
+                "submitted", [(message_id, batch_id) for message_id in message_ids]
+            )
 
     def mark_uploaded(self, message_id: str, notion_page_id: str):
         """Mark newsletter as uploaded to Notion."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE newsletters
-            SET notion_page_id = ?, status = 'completed', updated_at = ?
-            WHERE message_id = ?
-        """, (notion_page_id, datetime.now(), message_id))
+        with self.batch():
+            self.conn.execute(
+                self._SQL_MARK_UPLOADED, (notion_page_id, datetime.now(), message_id)
+            )
 
-        self.conn.commit()
-        self._log_event_by_message_id(message_id, "uploaded", notion_page_id)
+            self._log_event_by_message_id(message_id, "uploaded", notion_page_id)
 
     def mark_failed(self, message_id: str, error_message: str):
         """Mark newsletter as failed."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            UPDATE newsletters
-            SET status = 'failed', error_message = ?, updated_at = ?
-            WHERE message_id = ?
-        """, (error_message, datetime.now(), message_id))
+        with self.batch():
+            self.conn.execute(
+                self._SQL_MARK_FAILED, (error_message, datetime.now(), message_id)
+            )
 
-        self.conn.commit()
-        self._log_event_by_message_id(message_id, "failed", error_message)
+            self._log_event_by_message_id(message_id, "failed", error_message)
 
     def get_last_processed_date(self, sender_email: str) -> Optional[str]:
         """
@@ -208,62 +332,180 @@ class Database:
 
     def get_pending_newsletters(self) -> List[dict]:
         """Get all newsletters that are pending processing."""
+        return list(self.iter_pending_newsletters())
+
+    def iter_pending_newsletters(self, chunk_size: int = 500) -> Iterator[dict]:
+        """
+        Yield newsletters pending processing, oldest first.
+
+        Rows are fetched chunk_size at a time, so memory stays constant and
+        the first row is available before the whole result is read.
+
+        Args:
+            chunk_size: Rows fetched from SQLite per round
+        """
         cursor = self.conn.cursor()
+        cursor.arraysize = chunk_size
         cursor.execute("""
             SELECT * FROM newsletters
             WHERE status = 'pending'
             ORDER BY received_date ASC
         """)
 
+        while rows := cursor.fetchmany():
+            yield from (dict(row) for row in rows)
+
+    def get_submitted_newsletters(self, sender_email: Optional[str] = None) -> List[dict]:
+        """
+        Get newsletters waiting on a Message Batch.
+
+        Args:
+            sender_email: Optional sender to restrict to
+
+        Returns:
+            Rows ordered by batch, then received date
+        """
+        cursor = self.conn.cursor()
+        if sender_email:
+            cursor.execute("""
+                SELECT * FROM newsletters
+                WHERE status = 'submitted' AND sender_email = ?
+                ORDER BY batch_id, received_date ASC
+            """, (sender_email,))
+        else:
+            cursor.execute("""
+                SELECT * FROM newsletters
+                WHERE status = 'submitted'
+                ORDER BY batch_id, received_date ASC
+            """)
+
         return [dict(row) for row in cursor.fetchall()]
 
     def get_stats(self) -> dict:
         """Get processing statistics."""
+        # One pass over the table; totals are summed from the per-status rows
         cursor = self.conn.cursor()
-
-        stats = {}
-
-        # Total count
-        cursor.execute("SELECT COUNT(*) as total FROM newsletters")
-        stats['total'] = cursor.fetchone()['total']
-
-        # By status
         cursor.execute("""
-            SELECT status, COUNT(*) as count
+            SELECT status, COUNT(*) as count, COALESCE(SUM(tokens_used), 0) as tokens
             FROM newsletters
             GROUP BY status
         """)
-        stats['by_status'] = {row['status']: row['count'] for row in cursor.fetchall()}
+        rows = cursor.fetchall()
 
-        # Total tokens used
-        cursor.execute("SELECT SUM(tokens_used) as total_tokens FROM newsletters")
-        stats['total_tokens'] = cursor.fetchone()['total_tokens'] or 0
-
-        return stats
+        return {
+            'total': sum(row['count'] for row in rows),
+            'by_status': {row['status']: row['count'] for row in rows},
+            'total_tokens': sum(row['tokens'] for row in rows)
+        }
 
     def _log_event(self, newsletter_id: int, event: str, details: str = None):
         """Log a processing event."""
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO processing_log (newsletter_id, event, details)
-            VALUES (?, ?, ?)
-        """, (newsletter_id, event, details))
-        self.conn.commit()
+        self.conn.execute(self._SQL_LOG_EVENT, (newsletter_id, event, details))
+        self._commit()
 
     def _log_event_by_message_id(self, message_id: str, event: str, details: str = None):
         """Log event by message ID."""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            "SELECT id FROM newsletters WHERE message_id = ?",
-            (message_id,)
+        self._log_events_by_message_id(event, [(message_id, details)])
+
+    def _log_events_by_message_id(self, event: str, items: List[Tuple[str, Optional[str]]]):
+        """
+        Log one event for several newsletters.
+
+        The newsletter ID is resolved inside the INSERT, so each row is a
+        single statement; unknown message IDs insert nothing.
+
+        Args:
+            event: Event name
+            items: (message_id, details) pairs
+        """
+        self.conn.executemany(
+            self._SQL_LOG_EVENT_BY_MESSAGE_ID,
+            [(event, details, message_id) for message_id, details in items]
         )
-        row = cursor.fetchone()
-        if row:
-            self._log_event(row['id'], event, details)
+        self._commit()
+
+    def enqueue(self, write: Callable[..., None], *args):
+        """
+        Apply a write on the background writer thread.
+
+        Returns immediately, so the caller can start its next network call
+        while SQLite commits. The writer has its own connection (WAL allows
+        it alongside this one) and applies writes in order, each in its own
+        transaction. Any direct update (batch()) and flush() wait for queued
+        writes first; a failed write is raised from the next of those.
+
+        Args:
+            write: Function taking (connection, *args) that runs the statements
+            *args: Arguments for write
+        """
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run_writer, name="db-writer", daemon=True)
+            self._writer.start()
+        self._writer_queue.put((write, args))
+
+    def enqueue_extracted(self, message_id: str, extraction_path: str, tokens_used: int = None):
+        """Queue mark_extracted on the background writer."""
+        self.enqueue(self._write_extracted, [(message_id, extraction_path, tokens_used)])
+
+    def flush(self):
+        """
+        Wait until all queued writes have been applied.
+
+        Raises:
+            sqlite3.Error: If a queued write failed since the last flush
+        """
+        if self._writer is None:
+            return
+
+        self._writer_queue.join()
+        error, self._writer_error = self._writer_error, None
+        if error is not None:
+            raise error
+
+    def _run_writer(self):
+        """
+        Writer thread: apply queued writes until close() sends None.
+
+        Every item is acknowledged, even if the connection can't be opened
+        (it is retried on the next write), so flush() never blocks on a dead
+        writer; the error is raised from flush() instead.
+        """
+        conn = None
+        try:
+            while True:
+                item = self._writer_queue.get()
+                try:
+                    if item is None:
+                        return
+                    if conn is None:
+                        conn = sqlite3.connect(str(self.db_path), cached_statements=256)
+                        conn.execute("PRAGMA synchronous=NORMAL")
+                    write, args = item
+                    write(conn, *args)
+                    conn.commit()
+                except Exception as e:
+                    logger.exception("Queued database write failed")
+                    if self._writer_error is None:
+                        self._writer_error = e
+                    if conn is not None:
+                        with suppress(sqlite3.Error):
+                            conn.rollback()
+                finally:
+                    self._writer_queue.task_done()
+        finally:
+            if conn is not None:
+                conn.close()
 
     def close(self):
-        """Close database connection."""
-        self.conn.close()
+        """Close database connection (after writing any queued updates)."""
+        try:
+            self.flush()
+        finally:
+            if self._writer is not None:
+                self._writer_queue.put(None)
+                self._writer.join()
+                self._writer = None
+            self.conn.close()
 
     def __enter__(self):
         """Context manager entry."""